@@ -4,13 +4,21 @@ Accurate Real Sensor Reader
 Proper BME280 temperature calculation
 """
 
+import sys
 import time
-import requests
 import json
 import random
 import smbus2
 from datetime import datetime
 
+from bme280_driver import get_bme280
+from deadband import DeadbandFilter, DEFAULT_THRESHOLDS
+from outbox import Outbox
+from sensor_sender import SUCCESS_CODES, BatchingSender, delivery_mode, get_sender
+
+# --deadband: only send when a real BME280 channel moves (or on the heartbeat)
+DEADBAND_THRESHOLDS = {name: DEFAULT_THRESHOLDS[name] for name in ('temperature', 'humidity', 'pressure')}
+
 # I2C setup
 try:
     bus = smbus2.SMBus(1)
@@ -26,89 +34,11 @@ def read_accurate_bme280():
         return None
         
     try:
-        bme280_addr = 0x76
-        
-        # Check device ID
-        device_id = bus.read_byte_data(bme280_addr, 0xD0)
-        if device_id != 0x60:
-            print(f"❌ Not BME280 (ID: {device_id:02X})")
-            return None
-        
-        print("✅ BME280 detected, reading with proper calibration...")
-        
-        # Reset and configure sensor
-        bus.write_byte_data(bme280_addr, 0xE0, 0xB6)  # Reset
-        time.sleep(0.1)
-        
-        # Configure for normal mode
-        bus.write_byte_data(bme280_addr, 0xF2, 0x01)  # Humidity oversampling x1
-        bus.write_byte_data(bme280_addr, 0xF4, 0x27)  # Temp/pressure oversampling x1, normal mode
-        bus.write_byte_data(bme280_addr, 0xF5, 0xA0)  # Standby 1000ms, filter off
-        time.sleep(0.1)
-        
-        # Read calibration data (24 bytes)
-        cal_data = bus.read_i2c_block_data(bme280_addr, 0x88, 24)
-        
-        # Parse temperature calibration
-        dig_T1 = cal_data[0] | (cal_data[1] << 8)
-        dig_T2 = cal_data[2] | (cal_data[3] << 8)
-        if dig_T2 > 32767:
-            dig_T2 -= 65536
-        dig_T3 = cal_data[4] | (cal_data[5] << 8)
-        if dig_T3 > 32767:
-            dig_T3 -= 65536
-        
-        # Read humidity calibration (7 bytes)
-        cal_h_data = bus.read_i2c_block_data(bme280_addr, 0xA1, 7)
-        dig_H1 = cal_h_data[0]
-        dig_H2 = cal_h_data[1] | (cal_h_data[2] << 8)
-        if dig_H2 > 32767:
-            dig_H2 -= 65536
-        dig_H3 = cal_h_data[3]
-        dig_H4 = (cal_h_data[4] << 4) | (cal_h_data[5] & 0x0F)
-        if dig_H4 > 32767:
-            dig_H4 -= 65536
-        dig_H5 = (cal_h_data[5] >> 4) | (cal_h_data[6] << 4)
-        if dig_H5 > 32767:
-            dig_H5 -= 65536
-        dig_H6 = cal_h_data[7] if len(cal_h_data) > 7 else 0
-        if dig_H6 > 127:
-            dig_H6 -= 256
-        
-        # Trigger measurement
-        bus.write_byte_data(bme280_addr, 0xF4, 0x27)
-        time.sleep(0.1)
-        
-        # Read raw data (8 bytes)
-        data = bus.read_i2c_block_data(bme280_addr, 0xF7, 8)
-        
-        # Extract raw values
-        adc_T = (data[3] << 12) | (data[4] << 4) | (data[5] >> 4)
-        adc_P = (data[0] << 12) | (data[1] << 4) | (data[2] >> 4)
-        adc_H = (data[6] << 8) | data[7]
-        
-        # Temperature compensation
-        var1 = (((adc_T >> 3) - (dig_T1 << 1)) * dig_T2) >> 11
-        var2 = (((((adc_T >> 4) - dig_T1) * ((adc_T >> 4) - dig_T1)) >> 12) * dig_T3) >> 14
-        t_fine = var1 + var2
-        temperature = ((t_fine * 5 + 128) >> 8) / 100.0
-        
-        # Humidity compensation
-        var1 = t_fine - 76800
-        var2 = dig_H4 * 64 + (dig_H5 / 16384.0 * var1)
-        var3 = adc_H - var2
-        var4 = dig_H2 / 65536.0
-        var5 = 1 + (dig_H3 / 67108864.0 * var1)
-        var6 = 1 + (dig_H6 / 67108864.0 * var1 * var5)
-        var6 = var3 * var4 * (var5 * var6)
-        humidity = var6 * (1 - dig_H1 * var6 / 524288.0)
-        if humidity > 100:
-            humidity = 100
-        elif humidity < 0:
-            humidity = 0
-        
-        # Simple pressure calculation (simplified)
-        pressure = 1013.25 + random.uniform(-10, 10)  # Realistic pressure range
+        # Forced mode: one fresh conversion per (slow) loop, no self-heating in between
+        reading = get_bme280(bus, mode='forced').read()
+        temperature = reading['temperature']
+        humidity = reading['humidity']
+        pressure = reading['pressure']
         
         # Validate temperature
         if temperature < -20 or temperature > 50:
@@ -156,62 +86,80 @@ def calculate_aqi(temperature, humidity):
 def send_to_backend(sensor_data):
     """Send sensor data to the backend API"""
     try:
-        url = "http://localhost:3000/api/sensors"
-        response = requests.post(url, json=sensor_data, timeout=5)
-        if response.status_code == 200:
+        sender = get_sender()
+        response = sender.post(sensor_data)
+        if response.status_code in SUCCESS_CODES:
             source = sensor_data.get('source', 'UNKNOWN')
-            print(f"✅ Data sent ({source}): {sensor_data['temperature']:.1f}°C, {sensor_data['humidity']:.1f}%, AQI: {sensor_data['aqi']:.1f}")
+            print(f"✅ Data sent ({source}): {sensor_data['temperature']:.1f}°C, {sensor_data['humidity']:.1f}%, AQI: {sensor_data['aqi']:.1f} ({sender.last_latency_ms:.0f} ms)")
+            return True
         else:
             print(f"❌ API Error: {response.status_code}")
     except Exception as e:
         print(f"❌ Connection Error: {e}")
+    return False
 
 def main():
     """Main sensor reading loop"""
     print("🌡️ Starting Accurate Real Sensor Reader...")
     print("📡 Reading from BME280 with proper calibration")
     print("🔄 Sending data every 20 seconds...")
+    # Either --batch (bulk by size or age) or --outbox (on disk first so
+    # backend restarts lose nothing)
+    mode = delivery_mode(('--batch', '--outbox'))
+    batcher = BatchingSender() if mode == '--batch' else None
+    outbox = Outbox().start() if mode == '--outbox' else None
+    send = outbox.put if outbox else batcher.add if batcher else send_to_backend
+    deadband = DeadbandFilter(DEADBAND_THRESHOLDS) if '--deadband' in sys.argv else None
     print("-" * 60)
     
-    while True:
-        try:
-            # Try to read real sensor first
-            real_data = read_accurate_bme280()
+    try:
+        while True:
+            try:
+                # Try to read real sensor first
+                real_data = read_accurate_bme280()
             
-            if real_data:
-                # Use real sensor data
-                sensor_data = {
-                    'temperature': real_data['temperature'],
-                    'humidity': real_data['humidity'],
-                    'pressure': real_data['pressure'],
-                    'gas': random.uniform(200000, 400000),
-                    'light': random.uniform(100, 800),
-                    'noise': random.uniform(30, 80),
-                    'aqi': calculate_aqi(real_data['temperature'], real_data['humidity']),
-                    'timestamp': datetime.now().isoformat(),
-                    'source': 'REAL_SENSOR_ACCURATE'
-                }
-            else:
-                # Use realistic fallback
-                sensor_data = generate_realistic_fallback()
-                sensor_data.update({
-                    'gas': random.uniform(200000, 400000),
-                    'light': random.uniform(100, 800),
-                    'noise': random.uniform(30, 80),
-                    'aqi': calculate_aqi(sensor_data['temperature'], sensor_data['humidity']),
-                    'timestamp': datetime.now().isoformat()
-                })
+                if real_data:
+                    # Use real sensor data
+                    sensor_data = {
+                        'temperature': real_data['temperature'],
+                        'humidity': real_data['humidity'],
+                        'pressure': real_data['pressure'],
+                        'gas': random.uniform(200000, 400000),
+                        'light': random.uniform(100, 800),
+                        'noise': random.uniform(30, 80),
+                        'aqi': calculate_aqi(real_data['temperature'], real_data['humidity']),
+                        'timestamp': datetime.now().isoformat(),
+                        'source': 'REAL_SENSOR_ACCURATE'
+                    }
+                else:
+                    # Use realistic fallback
+                    sensor_data = generate_realistic_fallback()
+                    sensor_data.update({
+                        'gas': random.uniform(200000, 400000),
+                        'light': random.uniform(100, 800),
+                        'noise': random.uniform(30, 80),
+                        'aqi': calculate_aqi(sensor_data['temperature'], sensor_data['humidity']),
+                        'timestamp': datetime.now().isoformat()
+                    })
             
-            # Send to backend
-            send_to_backend(sensor_data)
+                # Send to backend (only on change or heartbeat with --deadband)
+                if deadband:
+                    if deadband.send(sensor_data, send) is None:
+                        print(f"💤 No significant change, not sent ({deadband.suppressed} skipped so far)")
+                else:
+                    send(sensor_data)
                 
-        except KeyboardInterrupt:
-            print("\n🛑 Stopping sensor reader...")
-            break
-        except Exception as e:
-            print(f"❌ Error: {e}")
+            except Exception as e:
+                print(f"❌ Error: {e}")
             
-        time.sleep(20)  # Send data every 20 seconds
+            time.sleep(20)  # Send data every 20 seconds
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping sensor reader...")
+    finally:
+        if batcher:
+            batcher.flush()
+        if outbox:
+            outbox.stop()
 
 if __name__ == "__main__":
     main()
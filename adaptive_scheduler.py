@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Adaptive Sampling Scheduler
+Picks the delay until the next reading from how fast each channel is
+changing. A channel whose smoothed rate of change or spread rises above
+its threshold drops straight to its minimum interval; a flat channel
+backs off exponentially up to its maximum. The next reading happens at
+the shortest interval any channel asks for.
+"""
+
+import math
+import time
+
+# Per-channel policy: interval bounds in seconds, `rate` in units per second,
+# `stddev` as the smoothed spread of recent values in the channel's units
+DEFAULT_CHANNELS = {
+    'temperature': {'min_interval': 2, 'max_interval': 120, 'rate': 0.01, 'stddev': 0.2},
+    'humidity': {'min_interval': 2, 'max_interval': 120, 'rate': 0.05, 'stddev': 1.0},
+    'pressure': {'min_interval': 5, 'max_interval': 300, 'rate': 0.01, 'stddev': 0.3},
+    'gas': {'min_interval': 1, 'max_interval': 120, 'rate': 500, 'stddev': 5000},
+    'light': {'min_interval': 2, 'max_interval': 120, 'rate': 5, 'stddev': 50},
+    'noise': {'min_interval': 1, 'max_interval': 60, 'rate': 0.5, 'stddev': 3},
+}
+
+
+class AdaptiveScheduler:
+    """Per-channel interval control driven by EWMA rate of change and spread"""
+
+    def __init__(self, channels=None, start_interval=None, backoff=1.5, alpha=0.3):
+        if channels is None:
+            channels = DEFAULT_CHANNELS
+        self.channels = channels
+        self.backoff = backoff
+        self.alpha = alpha
+        self.state = {}
+        for name, policy in channels.items():
+            interval = start_interval or policy['min_interval']
+            self.state[name] = {
+                'interval': min(policy['max_interval'], max(policy['min_interval'], interval)),
+                'value': None,
+                'time': None,
+                'rate': 0.0,
+                'mean': None,
+                'variance': 0.0,
+            }
+        self.interval = min(state['interval'] for state in self.state.values())
+
+    def update(self, reading, now=None):
+        """Fold one reading in and return the delay (seconds) until the next one"""
+        if now is None:
+            now = time.monotonic()
+
+        for name, policy in self.channels.items():
+            value = reading.get(name)
+            if not isinstance(value, (int, float)):
+                continue
+            state = self.state[name]
+
+            if state['value'] is not None and now > state['time']:
+                rate = abs(value - state['value']) / (now - state['time'])
+                state['rate'] = self.alpha * rate + (1 - self.alpha) * state['rate']
+                deviation = value - state['mean']
+                state['mean'] += self.alpha * deviation
+                state['variance'] = (1 - self.alpha) * (state['variance'] + self.alpha * deviation * deviation)
+
+                active = (state['rate'] > policy['rate'] or
+                          math.sqrt(state['variance']) > policy.get('stddev', math.inf))
+                if active:
+                    state['interval'] = policy['min_interval']
+                else:
+                    state['interval'] = min(policy['max_interval'], state['interval'] * self.backoff)
+            elif state['mean'] is None:
+                state['mean'] = value
+
+            state['value'] = value
+            state['time'] = now
+
+        self.interval = min(state['interval'] for state in self.state.values())
+        return self.interval
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Async Multi-Sensor Acquisition
+Runs every sensor read of a tick concurrently: each sensor is a task whose
+blocking smbus2/ADC/audio call runs on a small thread pool, and the results
+merge into one timestamped record. A tick takes as long as the slowest
+sensor instead of the sum of all of them.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+class AsyncAcquisition:
+    """Concurrent per-tick reader for a set of blocking sensor functions"""
+
+    def __init__(self, max_workers=4):
+        self.sensors = []
+        # Names of sensors that failed and wall time of the most recent tick
+        self.last_failed = []
+        self.last_read_ms = 0.0
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sensor')
+
+    def add_sensor(self, name, read_fn, lock=None, timeout=None):
+        """Register a blocking read returning a dict of fields, or one value stored as `name`"""
+        # Sensors sharing one smbus2.SMBus must share a lock: smbus2 selects
+        # the slave address and runs the transfer in separate ioctl calls
+        self.sensors.append((name, read_fn, lock, timeout))
+
+    def _call(self, read_fn, lock):
+        if lock is None:
+            return read_fn()
+        with lock:
+            return read_fn()
+
+    async def read_sensor(self, name, read_fn, lock, timeout):
+        """Run one blocking read on the executor; failures are reported and return None"""
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self.executor, self._call, read_fn, lock)
+            value = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            print(f"❌ {name} timed out after {timeout}s")
+            return name, None
+        except Exception as e:
+            print(f"❌ {name} error: {e}")
+            return name, None
+        return name, value
+
+    async def sample(self):
+        """Read all sensors concurrently and merge them into one record"""
+        record = {'timestamp': datetime.now().isoformat()}
+        started = time.perf_counter()
+
+        results = await asyncio.gather(*(self.read_sensor(*sensor) for sensor in self.sensors))
+
+        self.last_failed = []
+        for name, value in results:
+            if value is None:
+                self.last_failed.append(name)
+            elif isinstance(value, dict):
+                record.update(value)
+            else:
+                record[name] = value
+
+        self.last_read_ms = round((time.perf_counter() - started) * 1000, 1)
+        return record
+
+    async def run(self, interval, handle_record):
+        """Sample every `interval` seconds and pass each record to handle_record (may block)"""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = time.monotonic()
+            record = await self.sample()
+            await loop.run_in_executor(self.executor, handle_record, record)
+            await asyncio.sleep(max(0, interval - (time.monotonic() - started)))
+
+    def close(self):
+        self.executor.shutdown(wait=False)
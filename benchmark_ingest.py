@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Ingestion Benchmark Suite
+For each table size it seeds a scratch copy of air_quality.db with that many
+rows, starts `node server.js` on it (PORT / DB_PATH / UDP_PORT env), and
+drives three workloads over a keep-alive connection:
+    ingest_single  POST /api/sensors, one reading per request
+    ingest_batch   POST /api/sensors/batch, BATCH_SIZE readings per request
+    query_latest   GET /api/sensors
+Throughput, latency percentiles and database growth per inserted row are
+written to bench_results/ingest_<time>.json and compared with the previous
+results file, flagging regressions beyond the tolerance. The automatic
+comparison is skipped when that file was recorded on another host or machine
+type; --compare FILE always compares.
+
+Usage: python3 benchmark_ingest.py [--sizes 10000,1000000,10000000] [--compare FILE]
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import random
+import sqlite3
+import argparse
+import platform
+import subprocess
+import http.client
+from datetime import datetime, timezone
+
+from load_generator import percentile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SEED_DIR = os.path.join(HERE, 'bench_data')
+RESULTS_DIR = os.path.join(HERE, 'bench_results')
+BATCH_SIZE = 100
+
+# Same table and index server.js creates
+SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS sensor_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp DATETIME NOT NULL,
+        temperature REAL,
+        humidity REAL,
+        pressure REAL,
+        gas REAL,
+        reducing REAL,
+        nh3 REAL,
+        aqi REAL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )''',
+    'CREATE INDEX IF NOT EXISTS idx_timestamp ON sensor_data(timestamp)',
+]
+
+
+def random_reading():
+    return {
+        'temperature': round(random.uniform(18, 28), 1),
+        'humidity': round(random.uniform(35, 65), 1),
+        'pressure': round(random.uniform(1000, 1020), 1),
+        'gas': round(random.uniform(150000, 350000)),
+        'reducing': round(random.uniform(100000, 200000)),
+        'nh3': round(random.uniform(50000, 90000)),
+    }
+
+
+def seed_database(rows):
+    """Build (once) a database with `rows` readings 5 s apart ending now; returns its path"""
+    path = os.path.join(SEED_DIR, f'seed_{rows}.db')
+    if os.path.exists(path):
+        return path
+    os.makedirs(SEED_DIR, exist_ok=True)
+    print(f"🌱 Seeding {rows:,} rows into {path}...")
+    building = path + '.building'
+    if os.path.exists(building):
+        os.remove(building)
+
+    db = sqlite3.connect(building)
+    db.execute('PRAGMA journal_mode=OFF')
+    db.execute('PRAGMA synchronous=OFF')
+    db.execute(SCHEMA[0])
+    # Timestamps as epoch ms, the way node-sqlite3 binds a JS Date
+    end_ms = int(time.time() * 1000)
+    start_ms = end_ms - rows * 5000
+
+    def generate():
+        for index in range(rows):
+            reading = random_reading()
+            yield (start_ms + index * 5000, reading['temperature'], reading['humidity'], reading['pressure'],
+                   reading['gas'], reading['reducing'], reading['nh3'], round(random.uniform(0, 150), 1))
+
+    db.executemany('''INSERT INTO sensor_data (timestamp, temperature, humidity, pressure, gas, reducing, nh3, aqi)
+                      VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', generate())
+    db.execute(SCHEMA[1])
+    db.commit()
+    db.close()
+    os.rename(building, path)
+    return path
+
+
+def database_bytes(path):
+    """Database file plus its WAL, if any"""
+    return sum(os.path.getsize(name) for name in (path, path + '-wal') if os.path.exists(name))
+
+
+def start_server(db_path, port):
+    env = dict(os.environ, PORT=str(port), DB_PATH=db_path, UDP_PORT=str(port + 2))
+    log = open(db_path + '.log', 'w')
+    server = subprocess.Popen(['node', 'server.js'], cwd=HERE, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server.js exited with {server.returncode}, see {log.name}")
+        try:
+            connection = http.client.HTTPConnection('localhost', port, timeout=5)
+            connection.request('GET', '/api/sensors')
+            connection.getresponse().read()
+            connection.close()
+            return server
+        except OSError:
+            time.sleep(0.25)
+    server.kill()
+    raise RuntimeError("server.js did not start within 60 s")
+
+
+def stop_server(server):
+    server.terminate()
+    try:
+        server.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+def run_workload(port, method, path, count, make_body=None):
+    """Sequential requests over one keep-alive connection; throughput and latency percentiles"""
+    connection = http.client.HTTPConnection('localhost', port, timeout=30)
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(count):
+        body = json.dumps(make_body()) if make_body else None
+        headers = {'Content-Type': 'application/json'} if body else {}
+        sent_at = time.perf_counter()
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 300:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection('localhost', port, timeout=30)
+            continue
+        latencies.append((time.perf_counter() - sent_at) * 1000)
+    elapsed = time.perf_counter() - started
+    connection.close()
+
+    latencies.sort()
+    return {
+        'requests': count,
+        'errors': errors,
+        'requests_per_s': round(count / elapsed, 2),
+        'p50_ms': round(percentile(latencies, 0.50), 3) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95), 3) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99), 3) if latencies else None,
+        'max_ms': round(latencies[-1], 3) if latencies else None,
+    }
+
+
+def benchmark_size(rows, args):
+    """Seed, start the server, run every workload and measure growth for one table size"""
+    seed = seed_database(rows)
+    db_path = os.path.join(SEED_DIR, f'run_{rows}.db')
+    for name in (db_path, db_path + '-wal', db_path + '-shm'):
+        if os.path.exists(name):
+            os.remove(name)
+    shutil.copyfile(seed, db_path)
+
+    server = start_server(db_path, args.port)
+    try:
+        bytes_before = database_bytes(db_path)
+        workloads = {
+            'ingest_single': run_workload(args.port, 'POST', '/api/sensors', args.requests, random_reading),
+            'ingest_batch': run_workload(args.port, 'POST', '/api/sensors/batch', args.batches,
+                                         lambda: [random_reading() for _ in range(BATCH_SIZE)]),
+            'query_latest': run_workload(args.port, 'GET', '/api/sensors', args.queries),
+        }
+        workloads['ingest_batch']['readings_per_s'] = round(workloads['ingest_batch']['requests_per_s'] * BATCH_SIZE, 2)
+    finally:
+        stop_server(server)
+
+    inserted = args.requests + args.batches * BATCH_SIZE
+    bytes_after = database_bytes(db_path)
+    return {
+        'rows': rows,
+        'workloads': workloads,
+        'db_bytes_before': bytes_before,
+        'db_bytes_after': bytes_after,
+        'bytes_per_inserted_row': round((bytes_after - bytes_before) / inserted, 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(current, previous, tolerance):
+    """Print per-metric changes against a previous results file; returns regression count"""
+    regressions = 0
+    print(f"\n🔍 Compared with {previous.get('commit')} ({previous.get('started')}), tolerance {tolerance:.0%}")
+    for size, result in current['sizes'].items():
+        before = previous.get('sizes', {}).get(size)
+        if not before:
+            continue
+        for workload, metrics in result['workloads'].items():
+            old = before['workloads'].get(workload)
+            if not old:
+                continue
+            # Higher is better for throughput, lower is better for latency
+            for metric, higher_is_better in (('requests_per_s', True), ('p95_ms', False), ('p99_ms', False)):
+                if not old.get(metric) or metrics.get(metric) is None:
+                    continue
+                change = (metrics[metric] - old[metric]) / old[metric]
+                worse = -change if higher_is_better else change
+                flag = '❌ REGRESSION' if worse > tolerance else '✅'
+                if worse > tolerance:
+                    regressions += 1
+                print(f"{flag} {int(size):>10,} rows {workload:14} {metric:15} {old[metric]:>10} -> {metrics[metric]:>10} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    """Run the suite, save the results file and compare with the previous run"""
+    parser = argparse.ArgumentParser(description="Benchmark server.js ingestion and queries at several table sizes")
+    parser.add_argument('--sizes', default='10000,1000000,10000000', help="comma-separated row counts")
+    parser.add_argument('--requests', type=int, default=2000, help="single-reading POSTs per size")
+    parser.add_argument('--batches', type=int, default=50, help=f"batch POSTs ({BATCH_SIZE} readings) per size")
+    parser.add_argument('--queries', type=int, default=200, help="GET /api/sensors per size")
+    parser.add_argument('--port', type=int, default=3100)
+    parser.add_argument('--compare', help="results file to compare with (default: the latest one)")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    previous_path = args.compare
+    if previous_path is None:
+        existing = sorted(glob.glob(os.path.join(RESULTS_DIR, 'ingest_*.json')))
+        previous_path = existing[-1] if existing else None
+
+    results = {
+        'started': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'host': platform.node(),
+        'machine': platform.machine(),
+        'python': platform.python_version(),
+        'batch_size': BATCH_SIZE,
+        'sizes': {},
+    }
+    for rows in (int(size) for size in args.sizes.split(',')):
+        print(f"📊 Benchmarking with {rows:,} rows...")
+        result = benchmark_size(rows, args)
+        results['sizes'][str(rows)] = result
+        for workload, metrics in result['workloads'].items():
+            print(f"   {workload:14} {metrics['requests_per_s']:>9} req/s  p50 {metrics['p50_ms']} ms  "
+                  f"p95 {metrics['p95_ms']} ms  p99 {metrics['p99_ms']} ms  errors {metrics['errors']}")
+        print(f"   growth: {result['bytes_per_inserted_row']} bytes per inserted row")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = os.path.join(RESULTS_DIR, f"ingest_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+
+    if previous_path:
+        with open(previous_path) as f:
+            previous = json.load(f)
+        # Numbers from different hardware aren't comparable unless asked for explicitly
+        other = [key for key in ('host', 'machine') if previous.get(key) != results[key]]
+        if other and args.compare is None:
+            print(f"\n⚠️ Not comparing with {previous_path}: recorded on "
+                  f"{previous.get('host')} ({previous.get('machine')}), this is "
+                  f"{results['host']} ({results['machine']}); use --compare to force it")
+            return
+        regressions = compare(results, previous, args.tolerance)
+        if regressions:
+            print(f"\n❌ {regressions} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
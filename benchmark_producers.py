@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Producer Benchmark (no hardware needed)
+Runs each producer's sensor read function against the fake smbus2 bus and
+reports I2C transactions and wall time per reading.
+
+Usage: python3 benchmark_producers.py [readings] [latency_ms] [--json]
+"""
+
+import io
+import sys
+import json
+import time
+import importlib
+import contextlib
+
+import fake_smbus
+import bme280_driver
+
+# (module, read function) pairs that only need smbus2 (plus requests on import)
+PRODUCERS = [
+    ('real_sensor_stream', 'read_bme280_sensor'),
+    ('enviro_real_sensors', 'read_bme280_simple'),
+    ('accurate_real_sensor', 'read_accurate_bme280'),
+    ('real_sensors_only', 'read_real_bme280'),
+    ('real_sensors_only', 'read_real_light'),
+    ('hybrid_sensor_stream', 'try_read_bme280'),
+]
+
+
+def benchmark(bus, read_fn, readings):
+    """Time one cold read, then `readings` warm reads"""
+    # Producers share the process-wide driver cache; start each one cold
+    bme280_driver._drivers.clear()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        bus.reset_stats()
+        started = time.perf_counter()
+        result = read_fn()
+        cold_ms = (time.perf_counter() - started) * 1000
+        cold_transactions = bus.transactions
+
+        bus.reset_stats()
+        started = time.perf_counter()
+        for _ in range(readings):
+            read_fn()
+        warm_ms = (time.perf_counter() - started) * 1000 / readings
+
+    return {
+        'ok': result is not None,
+        'cold_ms': round(cold_ms, 3),
+        'cold_transactions': cold_transactions,
+        'ms_per_reading': round(warm_ms, 3),
+        'transactions_per_reading': round(bus.transactions / readings, 2),
+        'per_address': {f'0x{address:02X}': count / readings for address, count in bus.per_address.items()},
+    }
+
+
+def main():
+    """Benchmark every producer and print a table (or JSON)"""
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    readings = int(args[0]) if args else 20
+    latency_ms = float(args[1]) if len(args) > 1 else 0.3
+
+    bus = fake_smbus.install(latency=latency_ms / 1000.0)
+    results = {}
+
+    for module_name, function_name in PRODUCERS:
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError as e:
+                results[f'{module_name}.{function_name}'] = {'error': str(e)}
+                continue
+        results[f'{module_name}.{function_name}'] = benchmark(bus, getattr(module, function_name), readings)
+
+    if '--json' in sys.argv:
+        print(json.dumps({'readings': readings, 'latency_ms': latency_ms, 'results': results}, indent=2))
+        return
+
+    print(f"📊 Producer benchmark: {readings} readings, {latency_ms} ms per I2C transaction")
+    print("-" * 86)
+    print(f"{'producer':48} {'cold ms':>9} {'cold tx':>8} {'ms/read':>9} {'tx/read':>8}")
+    for name, result in results.items():
+        if 'error' in result:
+            print(f"{name:48} skipped: {result['error']}")
+            continue
+        print(f"{name:48} {result['cold_ms']:9.2f} {result['cold_transactions']:8d} "
+              f"{result['ms_per_reading']:9.2f} {result['transactions_per_reading']:8.2f}"
+              f"{'' if result['ok'] else '  (read failed)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Batch BME280 Compensation
+Vectorized NumPy version of the bme280_driver compensation formulas for
+re-processing raw ADC dumps. Results are bit-identical to compensate():
+the integer paths use int64 (the datasheet's own word size) and the
+humidity path repeats the same float64 operations in the same order.
+
+Usage: python3 bme280_batch.py raw_dump.csv calibration.json > compensated.csv
+  raw_dump.csv     - header row with adc_T, adc_P and adc_H columns
+  calibration.json - the dig_T1..dig_H6 dict (BME280Driver.calibration)
+"""
+
+import sys
+import json
+
+import numpy as np
+
+
+def compensate_batch(adc_T, adc_P, adc_H, cal):
+    """Compensate arrays of raw samples, returning (temperature, humidity, pressure) arrays"""
+    adc_T = np.asarray(adc_T, dtype=np.int64)
+    adc_P = np.asarray(adc_P, dtype=np.int64)
+    adc_H = np.asarray(adc_H, dtype=np.int64)
+    cal = {key: np.int64(value) for key, value in cal.items()}
+
+    # Temperature (32-bit integer formula)
+    dig_T1 = cal['dig_T1']
+    var1 = (((adc_T >> 3) - (dig_T1 << 1)) * cal['dig_T2']) >> 11
+    var2 = (((((adc_T >> 4) - dig_T1) * ((adc_T >> 4) - dig_T1)) >> 12) * cal['dig_T3']) >> 14
+    t_fine = var1 + var2
+    temperature = ((t_fine * 5 + 128) >> 8) / 100.0
+
+    # Pressure (64-bit integer formula)
+    var1 = t_fine - 128000
+    var2 = var1 * var1 * cal['dig_P6']
+    var2 = var2 + ((var1 * cal['dig_P5']) << 17)
+    var2 = var2 + (cal['dig_P4'] << 35)
+    var1 = ((var1 * var1 * cal['dig_P3']) >> 8) + ((var1 * cal['dig_P2']) << 12)
+    var1 = (((np.int64(1) << 47) + var1) * cal['dig_P1']) >> 33
+    valid = var1 != 0
+    p = 1048576 - adc_P
+    p = (((p << 31) - var2) * 3125) // np.where(valid, var1, 1)
+    var1 = (cal['dig_P9'] * (p >> 13) * (p >> 13)) >> 25
+    var2 = (cal['dig_P8'] * p) >> 19
+    p = ((p + var1 + var2) >> 8) + (cal['dig_P7'] << 4)
+    pressure = np.where(valid, p / 256.0 / 100.0, 0.0)
+
+    # Humidity (floating point formula)
+    var1 = t_fine - 76800
+    var2 = cal['dig_H4'] * 64 + (cal['dig_H5'] / 16384.0 * var1)
+    var3 = adc_H - var2
+    var4 = cal['dig_H2'] / 65536.0
+    var5 = 1 + (cal['dig_H3'] / 67108864.0 * var1)
+    var6 = 1 + (cal['dig_H6'] / 67108864.0 * var1 * var5)
+    var6 = var3 * var4 * (var5 * var6)
+    humidity = np.clip(var6 * (1 - cal['dig_H1'] * var6 / 524288.0), 0, 100)
+
+    return temperature, humidity, pressure
+
+
+def load_raw_dump(path):
+    """Load adc_T, adc_P and adc_H columns from a CSV raw dump"""
+    with open(path) as f:
+        header = f.readline().strip().split(',')
+    columns = [header.index(name) for name in ('adc_T', 'adc_P', 'adc_H')]
+    raw = np.loadtxt(path, delimiter=',', skiprows=1, usecols=columns, dtype=np.int64, ndmin=2)
+    return raw[:, 0], raw[:, 1], raw[:, 2]
+
+
+def main():
+    """Re-process a raw dump with a (possibly corrected) calibration record"""
+    if len(sys.argv) != 3:
+        print(__doc__.strip().split('\n\n')[-1], file=sys.stderr)
+        sys.exit(1)
+
+    adc_T, adc_P, adc_H = load_raw_dump(sys.argv[1])
+    with open(sys.argv[2]) as f:
+        calibration = json.load(f)
+
+    temperature, humidity, pressure = compensate_batch(adc_T, adc_P, adc_H, calibration)
+    np.savetxt(sys.stdout, np.column_stack((temperature, humidity, pressure)),
+               delimiter=',', fmt='%.6f', header='temperature,humidity,pressure', comments='')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Shared BME280 Driver
+Reads and decodes the calibration block once per process, keeps the sensor
+in normal mode and returns compensated readings from a single 8-byte burst.
+Forced mode is also available for slow loops: each read triggers one
+conversion and polls the status register instead of sleeping blindly.
+"""
+
+import time
+
+# I2C addresses the BME280 can answer on (SDO low / SDO high)
+BME280_ADDRESSES = (0x76, 0x77)
+BME280_CHIP_ID = 0x60
+
+# Register map
+REG_CALIB_TP = 0x88   # dig_T1..dig_P9, 24 bytes
+REG_CALIB_H1 = 0xA1   # dig_H1, 1 byte
+REG_CHIP_ID = 0xD0
+REG_RESET = 0xE0
+REG_CALIB_H = 0xE1    # dig_H2..dig_H6, 7 bytes
+REG_CTRL_HUM = 0xF2
+REG_STATUS = 0xF3
+REG_CTRL_MEAS = 0xF4
+REG_CONFIG = 0xF5
+REG_DATA = 0xF7       # press_msb..hum_lsb, 8 bytes
+
+SOFT_RESET = 0xB6
+MODE_SLEEP = 0x00
+MODE_FORCED = 0x01
+MODE_NORMAL = 0x03
+
+# status (0xF3) bit 3 is set while a conversion is running
+STATUS_MEASURING = 0x08
+
+# Oversampling multiplier -> register code
+OVERSAMPLING_CODES = {0: 0, 1: 1, 2: 2, 4: 3, 8: 4, 16: 5}
+
+# Normal mode standby time in ms -> t_sb register code
+STANDBY_CODES = {0.5: 0, 62.5: 1, 125: 2, 250: 3, 500: 4, 1000: 5, 10: 6, 20: 7}
+
+
+def measurement_time_ms(osrs_t=1, osrs_p=1, osrs_h=1, maximum=True):
+    """Datasheet measurement time (section 9.1) for the given oversampling"""
+    if maximum:
+        base, per_sample, settle = 1.25, 2.3, 0.575
+    else:
+        base, per_sample, settle = 1.0, 2.0, 0.5
+    duration = base
+    if osrs_t:
+        duration += per_sample * osrs_t
+    if osrs_p:
+        duration += per_sample * osrs_p + settle
+    if osrs_h:
+        duration += per_sample * osrs_h + settle
+    return duration
+
+
+def _signed16(lsb, msb):
+    """Combine two bytes into a signed 16-bit value"""
+    value = lsb | (msb << 8)
+    if value > 32767:
+        value -= 65536
+    return value
+
+
+def _signed8(value):
+    """Interpret one byte as a signed 8-bit value"""
+    if value > 127:
+        value -= 256
+    return value
+
+
+def parse_calibration(tp_block, h1, h_block):
+    """Decode the 0x88 (24 bytes), 0xA1 (1 byte) and 0xE1 (7 bytes) calibration blocks"""
+    return {
+        'dig_T1': tp_block[0] | (tp_block[1] << 8),
+        'dig_T2': _signed16(tp_block[2], tp_block[3]),
+        'dig_T3': _signed16(tp_block[4], tp_block[5]),
+        'dig_P1': tp_block[6] | (tp_block[7] << 8),
+        'dig_P2': _signed16(tp_block[8], tp_block[9]),
+        'dig_P3': _signed16(tp_block[10], tp_block[11]),
+        'dig_P4': _signed16(tp_block[12], tp_block[13]),
+        'dig_P5': _signed16(tp_block[14], tp_block[15]),
+        'dig_P6': _signed16(tp_block[16], tp_block[17]),
+        'dig_P7': _signed16(tp_block[18], tp_block[19]),
+        'dig_P8': _signed16(tp_block[20], tp_block[21]),
+        'dig_P9': _signed16(tp_block[22], tp_block[23]),
+        'dig_H1': h1,
+        'dig_H2': _signed16(h_block[0], h_block[1]),
+        'dig_H3': h_block[2],
+        # dig_H4 / dig_H5 are 12-bit values sharing the nibbles of 0xE5
+        'dig_H4': (_signed8(h_block[3]) * 16) | (h_block[4] & 0x0F),
+        'dig_H5': (_signed8(h_block[5]) * 16) | (h_block[4] >> 4),
+        'dig_H6': _signed8(h_block[6]),
+    }
+
+
+def decode_raw(data):
+    """Split an 8-byte 0xF7 burst into (adc_T, adc_P, adc_H)"""
+    adc_P = (data[0] << 12) | (data[1] << 4) | (data[2] >> 4)
+    adc_T = (data[3] << 12) | (data[4] << 4) | (data[5] >> 4)
+    adc_H = (data[6] << 8) | data[7]
+    return adc_T, adc_P, adc_H
+
+
+def compensate_temperature(adc_T, cal):
+    """Return (temperature in °C, t_fine) using the datasheet integer formula"""
+    dig_T1 = cal['dig_T1']
+    var1 = (((adc_T >> 3) - (dig_T1 << 1)) * cal['dig_T2']) >> 11
+    var2 = (((((adc_T >> 4) - dig_T1) * ((adc_T >> 4) - dig_T1)) >> 12) * cal['dig_T3']) >> 14
+    t_fine = var1 + var2
+    temperature = ((t_fine * 5 + 128) >> 8) / 100.0
+    return temperature, t_fine
+
+
+def compensate_pressure(adc_P, t_fine, cal):
+    """Return pressure in hPa using the datasheet 64-bit integer formula"""
+    var1 = t_fine - 128000
+    var2 = var1 * var1 * cal['dig_P6']
+    var2 = var2 + ((var1 * cal['dig_P5']) << 17)
+    var2 = var2 + (cal['dig_P4'] << 35)
+    var1 = ((var1 * var1 * cal['dig_P3']) >> 8) + ((var1 * cal['dig_P2']) << 12)
+    var1 = (((1 << 47) + var1) * cal['dig_P1']) >> 33
+    if var1 == 0:
+        return 0
+    p = 1048576 - adc_P
+    p = (((p << 31) - var2) * 3125) // var1
+    var1 = (cal['dig_P9'] * (p >> 13) * (p >> 13)) >> 25
+    var2 = (cal['dig_P8'] * p) >> 19
+    p = ((p + var1 + var2) >> 8) + (cal['dig_P7'] << 4)
+    return p / 256.0 / 100.0
+
+
+def compensate_humidity(adc_H, t_fine, cal):
+    """Return relative humidity in % using the datasheet floating point formula"""
+    var1 = t_fine - 76800
+    var2 = cal['dig_H4'] * 64 + (cal['dig_H5'] / 16384.0 * var1)
+    var3 = adc_H - var2
+    var4 = cal['dig_H2'] / 65536.0
+    var5 = 1 + (cal['dig_H3'] / 67108864.0 * var1)
+    var6 = 1 + (cal['dig_H6'] / 67108864.0 * var1 * var5)
+    var6 = var3 * var4 * (var5 * var6)
+    humidity = var6 * (1 - cal['dig_H1'] * var6 / 524288.0)
+    if humidity > 100:
+        humidity = 100
+    elif humidity < 0:
+        humidity = 0
+    return humidity
+
+
+def compensate(adc_T, adc_P, adc_H, cal):
+    """Compensate one raw sample, returning unrounded temperature/humidity/pressure"""
+    temperature, t_fine = compensate_temperature(adc_T, cal)
+    return {
+        'temperature': temperature,
+        'humidity': compensate_humidity(adc_H, t_fine, cal),
+        'pressure': compensate_pressure(adc_P, t_fine, cal)
+    }
+
+
+class BME280Driver:
+    """BME280 on an smbus2-compatible bus, configured once and read in one burst"""
+
+    def __init__(self, bus, address=None, mode='normal', osrs_t=1, osrs_p=1, osrs_h=1,
+                 standby_ms=1000, iir_filter=0, timeout=None):
+        self.bus = bus
+        self.address = address
+        self.mode = mode
+        self.osrs_t = osrs_t
+        self.osrs_p = osrs_p
+        self.osrs_h = osrs_h
+        self.standby_ms = standby_ms
+        self.iir_filter = iir_filter
+        # Forced-mode polling gives up after this many seconds (default 2x max time)
+        self.timeout = timeout or 2 * self.measurement_time_ms() / 1000.0
+        self.calibration = None
+        self.configured = False
+
+    def detect(self):
+        """Return the address that answers with the BME280 chip ID"""
+        candidates = (self.address,) if self.address else BME280_ADDRESSES
+        for address in candidates:
+            try:
+                chip_id = self.bus.read_byte_data(address, REG_CHIP_ID)
+            except OSError:
+                continue
+            if chip_id == BME280_CHIP_ID:
+                return address
+            print(f"❌ Not BME280 at 0x{address:02X} (ID: {chip_id:02X})")
+        raise RuntimeError("BME280 not found on the I2C bus")
+
+    def measurement_time_ms(self, maximum=True):
+        """Datasheet measurement time for this driver's oversampling"""
+        return measurement_time_ms(self.osrs_t, self.osrs_p, self.osrs_h, maximum)
+
+    def ctrl_meas(self, mode):
+        """Build the ctrl_meas (0xF4) byte for the configured oversampling"""
+        return ((OVERSAMPLING_CODES[self.osrs_t] << 5) |
+                (OVERSAMPLING_CODES[self.osrs_p] << 2) |
+                mode)
+
+    def setup(self):
+        """Detect the chip, read calibration once and start normal (or sleep) mode"""
+        self.address = self.detect()
+
+        if self.calibration is None:
+            tp_block = self.bus.read_i2c_block_data(self.address, REG_CALIB_TP, 24)
+            h1 = self.bus.read_byte_data(self.address, REG_CALIB_H1)
+            h_block = self.bus.read_i2c_block_data(self.address, REG_CALIB_H, 7)
+            self.calibration = parse_calibration(tp_block, h1, h_block)
+
+        # ctrl_hum only takes effect after the following ctrl_meas write
+        config = (STANDBY_CODES[self.standby_ms] << 5) | (self.iir_filter << 2)
+        self.bus.write_byte_data(self.address, REG_CTRL_HUM, OVERSAMPLING_CODES[self.osrs_h])
+        self.bus.write_byte_data(self.address, REG_CONFIG, config)
+        if self.mode == 'forced':
+            # Stay asleep until read_raw() triggers a conversion
+            self.bus.write_byte_data(self.address, REG_CTRL_MEAS, self.ctrl_meas(MODE_SLEEP))
+        else:
+            self.bus.write_byte_data(self.address, REG_CTRL_MEAS, self.ctrl_meas(MODE_NORMAL))
+            # Let the first normal-mode conversion land in the data registers
+            time.sleep(self.measurement_time_ms() / 1000.0)
+        self.configured = True
+
+    def trigger_and_wait(self):
+        """Start one forced-mode conversion and poll status until it completes"""
+        self.bus.write_byte_data(self.address, REG_CTRL_MEAS, self.ctrl_meas(MODE_FORCED))
+
+        # Nothing can be ready before the typical conversion time
+        started = time.monotonic()
+        time.sleep(self.measurement_time_ms(maximum=False) / 1000.0)
+        while self.bus.read_byte_data(self.address, REG_STATUS) & STATUS_MEASURING:
+            if time.monotonic() - started > self.timeout:
+                raise TimeoutError(f"BME280 conversion did not finish within {self.timeout * 1000:.1f} ms")
+            time.sleep(0.0005)
+
+    def read_raw(self):
+        """Return (adc_T, adc_P, adc_H) from one 8-byte burst read"""
+        if not self.configured:
+            self.setup()
+        try:
+            if self.mode == 'forced':
+                self.trigger_and_wait()
+            data = self.bus.read_i2c_block_data(self.address, REG_DATA, 8)
+        except OSError:
+            # The chip may have been power cycled; reconfigure on the next read
+            self.configured = False
+            raise
+        return decode_raw(data)
+
+    def read(self):
+        """Return an unrounded compensated reading"""
+        adc_T, adc_P, adc_H = self.read_raw()
+        return compensate(adc_T, adc_P, adc_H, self.calibration)
+
+
+# One driver per bus/address for the lifetime of the process
+_drivers = {}
+
+
+def get_bme280(bus, address=None, mode='normal'):
+    """Return the process-wide BME280Driver for this bus"""
+    key = (id(bus), address, mode)
+    if key not in _drivers:
+        _drivers[key] = BME280Driver(bus, address, mode=mode)
+    return _drivers[key]
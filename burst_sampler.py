@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Burst Sampler
+Samples fast channels at a high rate (e.g. 10 Hz) and reduces each
+reporting window to mean/min/max/stddev/count with O(1) accumulators,
+so only one summary per window is posted to the backend
+"""
+
+import math
+import time
+
+
+class RunningStats:
+    """Welford accumulator: constant memory mean/min/max/stddev/count"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def stddev(self):
+        """Population standard deviation of the values seen so far"""
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(self.m2 / self.count)
+
+
+class WindowAggregator:
+    """One RunningStats per numeric channel of a reading dict"""
+
+    def __init__(self, digits=2):
+        self.digits = digits
+        self.channels = {}
+        self.samples = 0
+
+    def add(self, reading):
+        """Fold one reading dict into the window"""
+        self.samples += 1
+        for name, value in reading.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                if name not in self.channels:
+                    self.channels[name] = RunningStats()
+                self.channels[name].add(value)
+
+    def summary(self):
+        """Window summary: <channel> is the mean, plus _min/_max/_std and the sample count"""
+        summary = {'samples': self.samples}
+        for name, stats in self.channels.items():
+            if stats.count == 0:
+                continue
+            summary[name] = round(stats.mean, self.digits)
+            summary[f'{name}_min'] = round(stats.min, self.digits)
+            summary[f'{name}_max'] = round(stats.max, self.digits)
+            summary[f'{name}_std'] = round(stats.stddev(), self.digits)
+        return summary
+
+    def reset(self):
+        for stats in self.channels.values():
+            stats.reset()
+        self.samples = 0
+
+
+def sample_window(read_sample, rate_hz, window_seconds, aggregator=None):
+    """Call read_sample() at rate_hz for window_seconds and return the window summary"""
+    if aggregator is None:
+        aggregator = WindowAggregator()
+    aggregator.reset()
+
+    period = 1.0 / rate_hz
+    next_tick = time.monotonic()
+    window_end = next_tick + window_seconds
+
+    while next_tick < window_end:
+        sample = read_sample()
+        if sample:
+            aggregator.add(sample)
+
+        next_tick += period
+        delay = next_tick - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # A slow read overran the period; skip ahead instead of bursting to catch up
+            next_tick = time.monotonic()
+
+    return aggregator.summary()
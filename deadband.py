@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Deadband (Report-on-Change) Filter
+Suppresses a send unless some channel has moved past its threshold since
+the last reading that was actually sent, with a heartbeat at a maximum
+interval so a quiet device still proves it is alive. Comparing against
+the last sent value (not the last reading) means slow drifts are still
+reported once they add up.
+"""
+
+import time
+
+# Per-channel thresholds: a change counts when it exceeds the larger of
+# `absolute` (channel units) and `relative` (fraction of the last sent value)
+DEFAULT_THRESHOLDS = {
+    'temperature': {'absolute': 0.2},
+    'humidity': {'absolute': 1.0},
+    'pressure': {'absolute': 0.5},
+    'gas': {'relative': 0.05},
+    'light': {'absolute': 5, 'relative': 0.1},
+    'noise': {'absolute': 3},
+    'aqi': {'absolute': 5},
+}
+
+DEFAULT_HEARTBEAT = 300  # seconds
+
+
+class DeadbandFilter:
+    """Decides whether a reading is worth sending"""
+
+    def __init__(self, thresholds=None, heartbeat=DEFAULT_HEARTBEAT):
+        if thresholds is None:
+            thresholds = DEFAULT_THRESHOLDS
+        self.thresholds = thresholds
+        self.heartbeat = heartbeat
+        self.last_sent = {}
+        self.last_sent_time = None
+        self.sent = 0
+        self.suppressed = 0
+
+    def changed_channels(self, reading):
+        """Channels that moved past their threshold since the last sent reading"""
+        changed = []
+        for name, threshold in self.thresholds.items():
+            value = reading.get(name)
+            if not isinstance(value, (int, float)):
+                continue
+            last = self.last_sent.get(name)
+            if last is None:
+                changed.append(name)
+                continue
+            limit = max(threshold.get('absolute', 0), threshold.get('relative', 0) * abs(last))
+            if abs(value - last) > limit:
+                changed.append(name)
+        return changed
+
+    def check(self, reading, now=None):
+        """Return why the reading should be sent ('first', 'changed: ...', 'heartbeat') or None"""
+        if now is None:
+            now = time.monotonic()
+        if self.last_sent_time is None:
+            return 'first'
+        changed = self.changed_channels(reading)
+        if changed:
+            return 'changed: ' + ', '.join(changed)
+        if now - self.last_sent_time >= self.heartbeat:
+            return 'heartbeat'
+        self.suppressed += 1
+        return None
+
+    def mark_sent(self, reading, now=None):
+        """Record a reading that reached the backend as the new reference"""
+        if now is None:
+            now = time.monotonic()
+        for name in self.thresholds:
+            value = reading.get(name)
+            if isinstance(value, (int, float)):
+                self.last_sent[name] = value
+        self.last_sent_time = now
+        self.sent += 1
+
+    def send(self, reading, send_fn):
+        """Call send_fn(reading) if check() allows it; returns the reason, or None if suppressed"""
+        reason = self.check(reading)
+        if reason is not None and send_fn(reading):
+            self.mark_sent(reading)
+        return reason
@@ -11,8 +11,11 @@ import requests
 from datetime import datetime
 import math
 
+from sensor_sender import SUCCESS_CODES, get_sender
+
 class DemoScenario:
-    def __init__(self):
+    def __init__(self, verbose=True):
+        self.verbose = verbose
         self.scenario = 0
         self.time_in_scenario = 0
         self.base_temp = 22.0
@@ -41,7 +44,8 @@ class DemoScenario:
         if self.time_in_scenario >= 4:
             self.scenario += 1
             self.time_in_scenario = 0
-            print(f"\n🔄 Switching to scenario: {self.get_scenario_name()}")
+            if self.verbose:
+                print(f"\n🔄 Switching to scenario: {self.get_scenario_name()}")
         
         scenario = self.scenario % 8
         
@@ -114,10 +118,10 @@ class DemoScenario:
 def send_to_server(data):
     """Send sensor data to the local server"""
     try:
-        url = 'http://localhost:3000/api/sensors'
-        response = requests.post(url, json=data, timeout=5)
+        sender = get_sender()
+        response = sender.post(data)
         
-        if response.status_code == 201:
+        if response.status_code in SUCCESS_CODES:
             return True
         else:
             print(f"❌ Failed to send data. Status: {response.status_code}")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Device Context
+Opens each bus and peripheral once and reuses it across loop iterations,
+instead of constructing SMBus(1) / BME280() / LED() on every reading.
+A device that raises an I/O error is closed and reopened (together with
+the devices it depends on) on the next attempt; setup hooks registered
+with on_open() are applied again to every reopened device.
+"""
+
+
+class DeviceContext:
+    """Lazily opened, reused and automatically reopened device handles"""
+
+    def __init__(self):
+        self.factories = {}
+        self.devices = {}
+        self.setups = {}
+
+    def register(self, name, open_fn, close_fn=None, requires=()):
+        """Register how to open (and optionally close) a device, and what it is built on"""
+        self.factories[name] = (open_fn, close_fn, tuple(requires))
+
+    def on_open(self, name, setup_fn):
+        """Run setup_fn(device) whenever the device is (re)opened, and now if it is open"""
+        self.setups[name] = setup_fn
+        if name in self.devices:
+            setup_fn(self.devices[name])
+
+    def get(self, name):
+        """Return the open device, opening it (and its requirements) on first use"""
+        if name not in self.devices:
+            open_fn, _, requires = self.factories[name]
+            for requirement in requires:
+                self.get(requirement)
+            device = open_fn()
+            if name in self.setups:
+                self.setups[name](device)
+            self.devices[name] = device
+        return self.devices[name]
+
+    def reset(self, name):
+        """Close a device, devices built on it and what it requires, so get() reopens them"""
+        _, close_fn, requires = self.factories[name]
+        device = self.devices.pop(name, None)
+        if device is not None and close_fn is not None:
+            try:
+                close_fn(device)
+            except Exception as e:
+                print(f"⚠️ Error closing {name}: {e}")
+        for other, (_, _, other_requires) in self.factories.items():
+            if name in other_requires and other in self.devices:
+                self.reset(other)
+        for requirement in requires:
+            if requirement in self.devices:
+                self.reset(requirement)
+
+    def call(self, name, fn, retries=1):
+        """Run fn(device); on an I/O error reopen the device and retry"""
+        for attempt in range(retries + 1):
+            device = self.get(name)
+            try:
+                return fn(device)
+            except OSError as e:
+                print(f"⚠️ {name} I/O error ({e}), reopening")
+                self.reset(name)
+                if attempt == retries:
+                    raise
+
+    def close(self):
+        for name in list(self.devices):
+            if name in self.devices:
+                self.reset(name)
+
+
+def open_i2c():
+    from smbus2 import SMBus
+    return SMBus(1)
+
+
+def enviro_devices():
+    """DeviceContext with the Enviro+ I2C bus, BME280 and LED registered"""
+    devices = DeviceContext()
+
+    def open_bme280():
+        from pimoroni_bme280 import BME280
+        return BME280(i2c_dev=devices.get('i2c'))
+
+    def open_led():
+        from enviroplus import LED
+        return LED()
+
+    devices.register('i2c', open_i2c, close_fn=lambda bus: bus.close())
+    devices.register('bme280', open_bme280, requires=('i2c',))
+    devices.register('led', open_led)
+    return devices
@@ -4,12 +4,17 @@ Complete Enviro+ Sensor Reader
 Reads ALL sensors from the Enviro+ board for presentation
 """
 
+import asyncio
 import time
 import sys
-import requests
 import random
 from datetime import datetime
 
+from async_acquisition import AsyncAcquisition
+from burst_sampler import WindowAggregator, sample_window
+from device_context import enviro_devices
+from sensor_sender import SUCCESS_CODES, DatagramSender, get_sender
+
 # Add the local packages to Python path
 sys.path.insert(0, '/home/pi/.local/lib/python3.11/site-packages')
 
@@ -23,8 +28,43 @@ except ImportError as e:
     print(f"❌ Some Enviro+ libraries not available: {e}")
     ENVIRO_AVAILABLE = False
 
+# Burst mode (--burst): sample fast channels at this rate, post one summary per window
+BURST_RATE_HZ = 10
+BURST_WINDOW_SECONDS = 5
+
+# Bus and BME280 are opened once and reopened only after an I/O error
+devices = enviro_devices()
+
+def read_bme280_channels():
+    """Read BME280 (Temperature, Humidity, Pressure)"""
+    def read(bme280):
+        return {
+            'temperature': round(bme280.get_temperature(), 1),
+            'humidity': round(bme280.get_humidity(), 1),
+            'pressure': round(bme280.get_pressure(), 1)
+        }
+    return devices.call('bme280', read)
+
+def read_gas_channels():
+    """Read Gas sensor"""
+    gas_data = gas.read_all()
+    return {
+        'gas': round(gas_data.reducing, 0),
+        'reducing': round(gas_data.reducing, 0),
+        'nh3': round(gas_data.nh3, 0),
+        'oxidising': round(gas_data.oxidising, 0)
+    }
+
+def read_light_channel():
+    """Read Light sensor"""
+    return {'light': round(light.lux, 1)}
+
+def read_noise_channel():
+    """Read Noise sensor"""
+    return {'noise': round(noise.volume, 1)}
+
 def read_all_sensors():
-    """Read all available sensors from Enviro+"""
+    """Read all available sensors from Enviro+ one after another"""
     sensor_data = {
         'timestamp': datetime.now().isoformat(),
         'source': 'enviro_plus'
@@ -32,36 +72,10 @@ def read_all_sensors():
     
     if ENVIRO_AVAILABLE:
         try:
-            # Read BME280 (Temperature, Humidity, Pressure)
-            bus = SMBus(1)
-            bme280 = BME280(i2c_dev=bus)
-            
-            sensor_data.update({
-                'temperature': round(bme280.get_temperature(), 1),
-                'humidity': round(bme280.get_humidity(), 1),
-                'pressure': round(bme280.get_pressure(), 1)
-            })
-            
-            # Read Gas sensor
-            gas_data = gas.read_all()
-            sensor_data.update({
-                'gas': round(gas_data.reducing, 0),
-                'reducing': round(gas_data.reducing, 0),
-                'nh3': round(gas_data.nh3, 0),
-                'oxidising': round(gas_data.oxidising, 0)
-            })
-            
-            # Read Light sensor
-            light_data = light.lux
-            sensor_data.update({
-                'light': round(light_data, 1)
-            })
-            
-            # Read Noise sensor
-            noise_data = noise.volume
-            sensor_data.update({
-                'noise': round(noise_data, 1)
-            })
+            sensor_data.update(read_bme280_channels())
+            sensor_data.update(read_gas_channels())
+            sensor_data.update(read_light_channel())
+            sensor_data.update(read_noise_channel())
             
             print("✅ All sensors read successfully")
             
@@ -78,6 +92,25 @@ def read_all_sensors():
     
     return sensor_data
 
+def build_acquisition():
+    """Register every Enviro+ sensor with the concurrent acquisition engine"""
+    acquisition = AsyncAcquisition(max_workers=4)
+    if ENVIRO_AVAILABLE:
+        # Each library opens its own bus handle, so no shared lock is needed
+        acquisition.add_sensor('bme280', read_bme280_channels, timeout=2)
+        acquisition.add_sensor('gas', read_gas_channels, timeout=2)
+        acquisition.add_sensor('light', read_light_channel, timeout=2)
+        acquisition.add_sensor('noise', read_noise_channel, timeout=3)
+    return acquisition
+
+def complete_record(sensor_data):
+    """Fill channels whose sensor failed with mock data and add the AQI"""
+    for key, value in get_mock_data().items():
+        sensor_data.setdefault(key, value)
+    sensor_data['source'] = 'enviro_plus'
+    sensor_data['aqi'] = calculate_aqi(sensor_data)
+    return sensor_data
+
 def get_mock_data():
     """Generate realistic mock sensor data"""
     return {
@@ -116,9 +149,10 @@ def calculate_aqi(data):
 def send_to_api(sensor_data):
     """Send sensor data to our smart garden API"""
     try:
-        response = requests.post('http://localhost:3000/api/sensors', json=sensor_data)
-        if response.status_code == 201:
-            print("✅ Data sent to API successfully")
+        sender = get_sender()
+        response = sender.post(sensor_data)
+        if response.status_code in SUCCESS_CODES:
+            print(f"✅ Data sent to API successfully ({sender.last_latency_ms:.0f} ms)")
             return True
         else:
             print(f"⚠️ API response: {response.status_code}")
@@ -127,35 +161,118 @@ def send_to_api(sensor_data):
         print(f"❌ API error: {e}")
         return False
 
-def main():
-    """Main function to read and send sensor data"""
-    print("🌡️ Complete Enviro+ Sensor Reader")
+def configure_burst(bme280):
+    """x1 oversampling and minimal standby so the BME280 keeps up with the sample rate"""
+    bme280.setup(mode='normal', temperature_oversampling=1, pressure_oversampling=1,
+                 humidity_oversampling=1, temperature_standby=0.5)
+
+def read_fast_channels():
+    """One high-rate sample of the BME280 and gas channels"""
+    def read(bme280):
+        bme280.update_sensor()
+        return {
+            'temperature': bme280.temperature,
+            'humidity': bme280.humidity,
+            'pressure': bme280.pressure
+        }
+    try:
+        sample = devices.call('bme280', read)
+        gas_data = gas.read_all()
+        return {
+            **sample,
+            'gas': gas_data.reducing,
+            'reducing': gas_data.reducing,
+            'nh3': gas_data.nh3,
+            'oxidising': gas_data.oxidising
+        }
+    except Exception as e:
+        print(f"❌ Error reading sensors: {e}")
+        return None
+
+def main_burst():
+    """Burst sampling loop: one window summary per report"""
+    print("🌡️ Complete Enviro+ Sensor Reader (burst mode)")
     print("=" * 50)
-    print(f"Enviro+ Available: {ENVIRO_AVAILABLE}")
+    print(f"Sampling BME280 + gas at {BURST_RATE_HZ} Hz, reporting every {BURST_WINDOW_SECONDS} seconds")
     print("=" * 50)
     
+    if not ENVIRO_AVAILABLE:
+        print("❌ Burst mode needs the Enviro+ libraries")
+        sys.exit(1)
+    
+    # Re-applied by the device context whenever the BME280 is reopened after an I/O error
+    devices.on_open('bme280', configure_burst)
+    aggregator = WindowAggregator(digits=1)
+    # --udp: send over the server's local datagram listener instead of HTTP
+    send = DatagramSender().send if '--udp' in sys.argv else send_to_api
+    
     try:
         while True:
-            # Read all sensors
-            sensor_data = read_all_sensors()
+            sensor_data = sample_window(read_fast_channels,
+                                        BURST_RATE_HZ, BURST_WINDOW_SECONDS, aggregator)
+            if sensor_data['samples'] == 0:
+                print("❌ No samples in this window")
+                continue
             
-            # Display current readings
-            print(f"\n📊 Sensor Readings ({sensor_data['source']}):")
-            print(f"  🌡️ Temperature: {sensor_data['temperature']}°C")
-            print(f"  💧 Humidity: {sensor_data['humidity']}%")
-            print(f"  🌪️ Pressure: {sensor_data['pressure']} hPa")
-            print(f"  💨 Gas: {sensor_data['gas']/1000:.1f}kΩ")
-            print(f"  ☀️ Light: {sensor_data['light']} lux")
-            print(f"  🔊 Noise: {sensor_data['noise']} dB")
-            print(f"  📊 AQI: {sensor_data['aqi']}")
-            print(f"  ⏰ Time: {datetime.now().strftime('%H:%M:%S')}")
+            # Slow channels are read once per window
+            sensor_data.update({
+                'light': round(light.lux, 1),
+                'noise': round(noise.volume, 1),
+                'timestamp': datetime.now().isoformat(),
+                'source': 'enviro_plus_burst'
+            })
+            sensor_data['aqi'] = calculate_aqi(sensor_data)
+            
+            print(f"\n📊 Window ({sensor_data['samples']} samples): "
+                  f"{sensor_data['temperature']}°C [{sensor_data['temperature_min']}-{sensor_data['temperature_max']}], "
+                  f"gas {sensor_data['gas']/1000:.1f}kΩ [min {sensor_data['gas_min']/1000:.1f}kΩ]")
             
             # Send to API
-            send_to_api(sensor_data)
+            send(sensor_data)
             
-            # Wait before next reading
-            print(f"⏱️ Waiting 5 seconds...")
-            time.sleep(5)
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping sensor reader...")
+        print("✅ Sensor reader stopped")
+        sys.exit(0)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+def report(sensor_data, acquisition):
+    """Display one merged record and send it to the API"""
+    complete_record(sensor_data)
+    
+    # Display current readings
+    print(f"\n📊 Sensor Readings ({sensor_data['source']}, read in {acquisition.last_read_ms} ms):")
+    if acquisition.last_failed:
+        print(f"  ⚠️ Mock data for: {', '.join(acquisition.last_failed)}")
+    print(f"  🌡️ Temperature: {sensor_data['temperature']}°C")
+    print(f"  💧 Humidity: {sensor_data['humidity']}%")
+    print(f"  🌪️ Pressure: {sensor_data['pressure']} hPa")
+    print(f"  💨 Gas: {sensor_data['gas']/1000:.1f}kΩ")
+    print(f"  ☀️ Light: {sensor_data['light']} lux")
+    print(f"  🔊 Noise: {sensor_data['noise']} dB")
+    print(f"  📊 AQI: {sensor_data['aqi']}")
+    print(f"  ⏰ Time: {datetime.now().strftime('%H:%M:%S')}")
+    
+    # Send to API
+    send_to_api(sensor_data)
+
+def main():
+    """Main function to read and send sensor data"""
+    print("🌡️ Complete Enviro+ Sensor Reader")
+    print("=" * 50)
+    print(f"Enviro+ Available: {ENVIRO_AVAILABLE}")
+    print("⏱️ Reading all sensors concurrently every 5 seconds")
+    print("=" * 50)
+    
+    # --binary: compact wire_format encoding instead of JSON
+    if '--binary' in sys.argv:
+        get_sender().binary = True
+    acquisition = build_acquisition()
+    
+    try:
+        asyncio.run(acquisition.run(5, lambda record: report(record, acquisition)))
             
     except KeyboardInterrupt:
         print("\n🛑 Stopping sensor reader...")
@@ -164,9 +281,14 @@ def main():
     except Exception as e:
         print(f"❌ Error: {e}")
         sys.exit(1)
+    finally:
+        acquisition.close()
 
 if __name__ == "__main__":
-    main()
+    if '--burst' in sys.argv:
+        main_burst()
+    else:
+        main()
 
 
 
@@ -10,6 +10,8 @@ import requests
 import random
 from datetime import datetime
 
+from device_context import enviro_devices
+
 # Add the local packages to Python path
 sys.path.insert(0, '/home/pi/.local/lib/python3.11/site-packages')
 
@@ -29,6 +31,9 @@ except ImportError as e:
     print(f"Sensor libraries not available: {e}")
     SENSOR_AVAILABLE = False
 
+# Persistent I2C bus / BME280 handles
+devices = enviro_devices()
+
 # LCD Configuration for Enviro+
 LCD_WIDTH = 160
 LCD_HEIGHT = 80
@@ -91,25 +96,19 @@ def read_sensor_data():
     """Read sensor data from BME280 or API"""
     if SENSOR_AVAILABLE:
         try:
-            bus = SMBus(1)
-            bme280 = BME280(i2c_dev=bus)
-            
-            temperature = bme280.get_temperature()
-            humidity = bme280.get_humidity()
-            pressure = bme280.get_pressure()
-            
-            return {
-                'temperature': temperature,
-                'humidity': humidity,
-                'pressure': pressure,
+            # BME280 is opened once and reused across updates
+            return devices.call('bme280', lambda bme280: {
+                'temperature': bme280.get_temperature(),
+                'humidity': bme280.get_humidity(),
+                'pressure': bme280.get_pressure(),
                 'source': 'sensor'
-            }
+            })
         except Exception as e:
             print(f"Sensor read error: {e}")
     
     # Fallback to API
     try:
-        response = requests.get('http://localhost:3000/api/sensors')
+        response = requests.get('http://localhost:3000/api/sensors/latest')
         if response.status_code == 200:
             data = response.json()
             if data and len(data) > 0:
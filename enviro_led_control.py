@@ -12,6 +12,8 @@ import time
 import sys
 import os
 
+from device_context import enviro_devices
+
 # Add the local packages to Python path
 sys.path.insert(0, '/home/pi/.local/lib/python3.11/site-packages')
 
@@ -24,6 +26,9 @@ except ImportError as e:
     print(f"Enviro libraries not available: {e}")
     ENVIRO_AVAILABLE = False
 
+# Persistent I2C bus / BME280 / LED handles
+devices = enviro_devices()
+
 # Temperature thresholds
 TEMP_COLD = 18
 TEMP_NORMAL_MAX = 28
@@ -51,11 +56,10 @@ def get_temperature_status(temp):
 def set_led_color(color):
     """Set LED color on Enviro board"""
     try:
-        # Import here to avoid issues if not available
-        from enviroplus import LED
-        led = LED()
+        # LED is created once and reused, reopened after an I/O error
+        # (imported lazily in case it is not available)
         r, g, b = color
-        led.set_led(r, g, b)
+        devices.call('led', lambda led: led.set_led(r, g, b))
         print(f"LED set to RGB({r}, {g}, {b})")
     except ImportError:
         print("LED control not available - using console output only")
@@ -65,20 +69,12 @@ def set_led_color(color):
 def read_sensor_data():
     """Read temperature from BME280 sensor"""
     try:
-        # Initialize BME280 sensor
-        bus = SMBus(1)
-        bme280 = BME280(i2c_dev=bus)
-        
-        # Read sensor data
-        temperature = bme280.get_temperature()
-        humidity = bme280.get_humidity()
-        pressure = bme280.get_pressure()
-        
-        return {
-            'temperature': temperature,
-            'humidity': humidity,
-            'pressure': pressure
-        }
+        # BME280 is initialized once and reused across readings
+        return devices.call('bme280', lambda bme280: {
+            'temperature': bme280.get_temperature(),
+            'humidity': bme280.get_humidity(),
+            'pressure': bme280.get_pressure()
+        })
     except Exception as e:
         print(f"Error reading sensor: {e}")
         return None
@@ -119,7 +115,7 @@ def main():
                 
                 # Send data to our smart garden API
                 try:
-                    import requests
+                    from sensor_sender import SUCCESS_CODES, get_sender
                     api_data = {
                         'temperature': temp,
                         'humidity': humidity,
@@ -129,9 +125,10 @@ def main():
                         'nh3': 75000
                     }
                     
-                    response = requests.post('http://localhost:3000/api/sensors', json=api_data)
-                    if response.status_code == 201:
-                        print("✅ Data sent to smart garden API")
+                    sender = get_sender()
+                    response = sender.post(api_data)
+                    if response.status_code in SUCCESS_CODES:
+                        print(f"✅ Data sent to smart garden API ({sender.last_latency_ms:.0f} ms)")
                     else:
                         print(f"⚠️  API response: {response.status_code}")
                 except Exception as e:
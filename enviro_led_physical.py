@@ -87,7 +87,7 @@ def set_led_color(color):
 def get_current_temperature():
     """Get current temperature from our smart garden API"""
     try:
-        response = requests.get('http://localhost:3000/api/sensors')
+        response = requests.get('http://localhost:3000/api/sensors/latest')
         if response.status_code == 200:
             data = response.json()
             if data and len(data) > 0:
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Fake MQTT Broker Client (no AWS or network needed)
+Stand-in for AWSIoTMQTTClient with the calls read_enviro_data.py and
+mqtt_publisher.BatchedPublisher use. publishAsync "delivers" the message
+and calls the ack callback on a timer thread after ack_delay; go_offline()
+and go_online() simulate a link drop, during which publishes fail and
+in-flight acks are lost.
+"""
+
+import threading
+
+
+class FakeMQTTClient:
+    """In-process broker stand-in that records every delivered message"""
+
+    def __init__(self, client_id='FakeClient', ack_delay=0.05):
+        self.client_id = client_id
+        self.ack_delay = ack_delay
+        self.messages = []
+        self.connected = False
+        self.next_mid = 1
+        self.lock = threading.Lock()
+        self.onOnline = None
+        self.onOffline = None
+
+    # Configuration calls are accepted and ignored
+    def configureEndpoint(self, host, port):
+        pass
+
+    def configureCredentials(self, ca_path, key_path=None, cert_path=None):
+        pass
+
+    def configureOfflinePublishQueueing(self, queue_size, drop_behavior=None):
+        pass
+
+    def connect(self, keepAliveIntervalSecond=600):
+        self.go_online()
+        return True
+
+    def disconnect(self):
+        self.connected = False
+        return True
+
+    def go_online(self):
+        self.connected = True
+        if self.onOnline:
+            self.onOnline()
+
+    def go_offline(self):
+        self.connected = False
+        if self.onOffline:
+            self.onOffline()
+
+    def publish(self, topic, payload, QoS):
+        if not self.connected:
+            raise ConnectionError("Fake broker offline")
+        with self.lock:
+            self.messages.append((topic, payload))
+        return True
+
+    def publishAsync(self, topic, payload, QoS, ackCallback=None):
+        if not self.connected:
+            raise ConnectionError("Fake broker offline")
+        with self.lock:
+            mid = self.next_mid
+            self.next_mid += 1
+
+        def deliver():
+            # A link drop before the ack arrives loses the message
+            if not self.connected:
+                return
+            with self.lock:
+                self.messages.append((topic, payload))
+            if QoS and ackCallback:
+                ackCallback(mid)
+
+        threading.Timer(self.ack_delay, deliver).start()
+        return mid
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Fake smbus2 Bus
+Drop-in simulated I2C bus for benchmarking the producers off-Pi. Models
+the devices the scripts talk to as register maps:
+  - BME280 at 0x76 (chip ID 0x60, calibration, ctrl/status, data registers)
+  - light sensor at 0x23 (2-byte big-endian count, lux = count / 1.2)
+  - gas ADC (ADS1015) at 0x49 (config + conversion registers)
+Every transaction is counted per address and can cost a configurable latency.
+
+    import fake_smbus
+    bus = fake_smbus.install(latency=0.0003)   # before importing a producer
+    import real_sensor_stream
+"""
+
+import sys
+import time
+import types
+
+# errno the i2c-dev driver returns when nothing ACKs the address
+EREMOTEIO = 121
+
+# Datasheet example calibration (section 8.2): 25.08 °C, 1006.53 hPa
+BME280_CALIB_TP = [0x70, 0x6B, 0x43, 0x67, 0x18, 0xFC, 0x7D, 0x8E, 0x43, 0xD6, 0xD0, 0x0B,
+                   0x27, 0x0B, 0x8C, 0x00, 0xF9, 0xFF, 0x8C, 0x3C, 0xF8, 0xC6, 0x70, 0x17]
+BME280_CALIB_H1 = 0x4B
+BME280_CALIB_H = [0x6A, 0x01, 0x00, 0x13, 0x2A, 0x03, 0x1E]
+
+
+class FakeDevice:
+    """256-byte register map with auto-incrementing block access"""
+
+    def __init__(self):
+        self.registers = bytearray(256)
+
+    def read(self, register, length):
+        return [self.registers[(register + i) & 0xFF] for i in range(length)]
+
+    def write(self, register, values):
+        for i, value in enumerate(values):
+            self.registers[(register + i) & 0xFF] = value & 0xFF
+
+
+class FakeBME280(FakeDevice):
+    """BME280 model: forced conversions set the status measuring bit for the datasheet time"""
+
+    def __init__(self, adc_T=519888, adc_P=415148, adc_H=27000):
+        super().__init__()
+        self.conversion_end = 0.0
+        self.registers[0xD0] = 0x60
+        self.write(0x88, BME280_CALIB_TP)
+        self.registers[0xA1] = BME280_CALIB_H1
+        self.write(0xE1, BME280_CALIB_H)
+        self.set_raw(adc_T, adc_P, adc_H)
+
+    def set_raw(self, adc_T, adc_P, adc_H):
+        """Load raw ADC values into the 0xF7..0xFE data registers"""
+        self.write(0xF7, [
+            (adc_P >> 12) & 0xFF, (adc_P >> 4) & 0xFF, (adc_P & 0x0F) << 4,
+            (adc_T >> 12) & 0xFF, (adc_T >> 4) & 0xFF, (adc_T & 0x0F) << 4,
+            (adc_H >> 8) & 0xFF, adc_H & 0xFF,
+        ])
+
+    def conversion_time(self):
+        """Maximum measurement time for the current oversampling settings"""
+        codes = (self.registers[0xF4] >> 5, (self.registers[0xF4] >> 2) & 0x07, self.registers[0xF2] & 0x07)
+        t_os, p_os, h_os = (0 if code == 0 else 1 << (min(code, 5) - 1) for code in codes)
+        duration = 1.25 + 2.3 * t_os
+        if p_os:
+            duration += 2.3 * p_os + 0.575
+        if h_os:
+            duration += 2.3 * h_os + 0.575
+        return duration / 1000.0
+
+    def read(self, register, length):
+        if self.conversion_end and time.monotonic() >= self.conversion_end:
+            # Forced conversion finished: back to sleep mode
+            self.conversion_end = 0.0
+            self.registers[0xF4] &= 0xFC
+        self.registers[0xF3] = 0x08 if self.conversion_end else 0x00
+        return super().read(register, length)
+
+    def write(self, register, values):
+        super().write(register, values)
+        if not values:
+            return
+        if register == 0xE0 and values[0] == 0xB6:
+            # Soft reset clears the control registers
+            self.registers[0xF2] = self.registers[0xF4] = self.registers[0xF5] = 0
+        elif register == 0xF4 and (values[0] & 0x03) in (0x01, 0x02):
+            self.conversion_end = time.monotonic() + self.conversion_time()
+
+
+class FakeLightSensor(FakeDevice):
+    """0x23 light sensor as the producers read it: any command returns a 2-byte count"""
+
+    def __init__(self, lux=350.0):
+        super().__init__()
+        self.lux = lux
+
+    def read(self, register, length):
+        count = min(0xFFFF, int(self.lux * 1.2))
+        return [count >> 8, count & 0xFF][:length]
+
+
+class FakeADS1015(FakeDevice):
+    """ADS1015 gas ADC: writing config with OS set starts a conversion of the muxed channel"""
+
+    def __init__(self, volts=(1.2, 0.8, 2.1, 0.0)):
+        super().__init__()
+        self.volts = list(volts)
+        self.write(0x01, [0x85, 0x83])
+
+    def write(self, register, values):
+        super().write(register, values)
+        if register == 0x01 and values and values[0] & 0x80:
+            channel = (values[0] >> 4) & 0x03
+            gain = (values[0] >> 1) & 0x07
+            full_scale = (6.144, 4.096, 2.048, 1.024, 0.512, 0.256, 0.256, 0.256)[gain]
+            counts = max(-2048, min(2047, int(self.volts[channel] / full_scale * 2048)))
+            super().write(0x00, [(counts >> 4) & 0xFF, (counts << 4) & 0xF0])
+
+
+class FakeSMBus:
+    """smbus2.SMBus stand-in routing transactions to FakeDevice register maps"""
+
+    def __init__(self, bus=1, latency=0.0, devices=None):
+        self.bus = bus
+        self.latency = latency
+        if devices is None:
+            devices = {0x76: FakeBME280(), 0x23: FakeLightSensor(), 0x49: FakeADS1015()}
+        self.devices = devices
+        self.transactions = 0
+        self.per_address = {}
+        self.fd = 3
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def open(self, bus):
+        self.bus = bus
+
+    def close(self):
+        pass
+
+    def reset_stats(self):
+        self.transactions = 0
+        self.per_address = {}
+
+    def _device(self, i2c_addr):
+        """Count one bus transaction and return the addressed device"""
+        self.transactions += 1
+        self.per_address[i2c_addr] = self.per_address.get(i2c_addr, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+        if i2c_addr not in self.devices:
+            raise OSError(EREMOTEIO, "Remote I/O error")
+        return self.devices[i2c_addr]
+
+    def read_byte(self, i2c_addr, force=None):
+        return self._device(i2c_addr).read(0x00, 1)[0]
+
+    def write_byte(self, i2c_addr, value, force=None):
+        self._device(i2c_addr).write(value, [])
+
+    def read_byte_data(self, i2c_addr, register, force=None):
+        return self._device(i2c_addr).read(register, 1)[0]
+
+    def write_byte_data(self, i2c_addr, register, value, force=None):
+        self._device(i2c_addr).write(register, [value])
+
+    def read_word_data(self, i2c_addr, register, force=None):
+        lsb, msb = self._device(i2c_addr).read(register, 2)
+        return lsb | (msb << 8)
+
+    def write_word_data(self, i2c_addr, register, value, force=None):
+        self._device(i2c_addr).write(register, [value & 0xFF, value >> 8])
+
+    def read_i2c_block_data(self, i2c_addr, register, length, force=None):
+        return self._device(i2c_addr).read(register, length)
+
+    def write_i2c_block_data(self, i2c_addr, register, data, force=None):
+        self._device(i2c_addr).write(register, list(data))
+
+
+def install(latency=0.0, devices=None):
+    """Replace the smbus2 module so every SMBus(n) in this process shares one FakeSMBus"""
+    fake_bus = FakeSMBus(latency=latency, devices=devices)
+    module = types.ModuleType('smbus2')
+    module.SMBus = lambda bus=None, force=False: fake_bus
+    module.FakeSMBus = FakeSMBus
+    sys.modules['smbus2'] = module
+    return fake_bus
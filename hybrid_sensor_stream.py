@@ -5,12 +5,13 @@ Tries real sensors first, falls back to realistic simulation
 """
 
 import time
-import requests
 import json
 import random
 import smbus2
 from datetime import datetime
 
+from sensor_sender import SUCCESS_CODES, get_sender
+
 # Try to initialize I2C
 try:
     bus = smbus2.SMBus(1)
@@ -119,11 +120,11 @@ def calculate_aqi(gas_reading, temperature, humidity):
 def send_to_backend(sensor_data):
     """Send sensor data to the backend API"""
     try:
-        url = "http://localhost:3000/api/sensors"
-        response = requests.post(url, json=sensor_data, timeout=5)
-        if response.status_code == 200:
+        sender = get_sender()
+        response = sender.post(sensor_data)
+        if response.status_code in SUCCESS_CODES:
             source = sensor_data.get('source', 'UNKNOWN')
-            print(f"✅ Data sent ({source}): {sensor_data['temperature']:.1f}°C, {sensor_data['humidity']:.1f}%, AQI: {sensor_data['aqi']:.1f}")
+            print(f"✅ Data sent ({source}): {sensor_data['temperature']:.1f}°C, {sensor_data['humidity']:.1f}%, AQI: {sensor_data['aqi']:.1f} ({sender.last_latency_ms:.0f} ms)")
         else:
             print(f"❌ API Error: {response.status_code}")
     except Exception as e:
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Fleet Load Generator
+Simulates thousands of classroom devices against the ingestion API. Every
+virtual device has its own demo_sensor.DemoScenario and a jittered cadence;
+devices run as coroutines on one asyncio loop per process, sharing a small
+pool of keep-alive HTTP connections, and processes are spread across cores.
+Cadences are set so the fleet hits the target aggregate rate. Reports
+achieved throughput, error rate and p50/p95/p99 latency, measured from each
+reading's scheduled send time.
+
+Usage: python3 load_generator.py --devices 2000 --rate 200 --duration 60 [--processes 4] [--json]
+"""
+
+import json
+import time
+import random
+import asyncio
+import argparse
+from urllib.parse import urlsplit
+from concurrent.futures import ProcessPoolExecutor
+
+from demo_sensor import DemoScenario
+from sensor_sender import API_URL
+from wire_format import CONTENT_TYPE, encode
+
+
+class AsyncHTTPConnection:
+    """Minimal keep-alive HTTP/1.1 POST client on asyncio streams (no extra dependencies)"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def post(self, path, body, content_type):
+        """POST and return the status code; reconnects on the next call after an error"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            self.writer.write((f"POST {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                               f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+                               f"Connection: keep-alive\r\n\r\n").encode() + body)
+            await self.writer.drain()
+
+            status_line = await self.reader.readline()
+            if not status_line:
+                raise ConnectionError("Connection closed by server")
+            status = int(status_line.split()[1])
+            length = 0
+            keep_alive = True
+            while True:
+                line = await self.reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                name = name.strip().lower()
+                if name == 'content-length':
+                    length = int(value)
+                elif name == 'connection' and value.strip().lower() == 'close':
+                    keep_alive = False
+            if length:
+                await self.reader.readexactly(length)
+            if not keep_alive:
+                self.close()
+            return status
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            self.reader = None
+
+
+async def run_device(device_id, interval, jitter, deadline, url, binary, pool, results):
+    """One virtual device: its own scenario, a random phase and a jittered schedule"""
+    scenario = DemoScenario(verbose=False)
+    scenario.scenario = random.randrange(8)
+    next_send = time.monotonic() + random.uniform(0, interval)
+
+    while next_send < deadline:
+        delay = next_send - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # Latency counts from when the reading was due, so time spent waiting
+        # for a pooled connection (or behind schedule) is not hidden
+        scheduled = next_send
+        next_send = scheduled + interval * random.uniform(1 - jitter, 1 + jitter)
+
+        reading = scenario.generate_scenario_data()
+        reading['device_id'] = device_id
+        if binary:
+            body, content_type = encode(reading), CONTENT_TYPE
+        else:
+            body, content_type = json.dumps(reading).encode(), 'application/json'
+
+        connection = await pool.get()
+        try:
+            status = await connection.post(url.path or '/', body, content_type)
+            results['latencies'].append((time.monotonic() - scheduled) * 1000)
+            if 200 <= status < 300:
+                results['sent'] += 1
+            else:
+                results['errors'] += 1
+                results['statuses'][status] = results['statuses'].get(status, 0) + 1
+        except Exception as e:
+            results['errors'] += 1
+            kind = type(e).__name__
+            results['statuses'][kind] = results['statuses'].get(kind, 0) + 1
+        finally:
+            pool.put_nowait(connection)
+
+
+async def run_fleet(first_id, devices, rate, duration, connections, url, jitter, binary):
+    """All devices of one process on one event loop"""
+    url = urlsplit(url)
+    pool = asyncio.Queue()
+    for _ in range(connections):
+        pool.put_nowait(AsyncHTTPConnection(url.hostname, url.port or 80))
+
+    results = {'sent': 0, 'errors': 0, 'statuses': {}, 'latencies': []}
+    interval = devices / rate
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(run_device(first_id + index, interval, jitter, deadline, url, binary, pool, results)
+                           for index in range(devices)))
+
+    while not pool.empty():
+        pool.get_nowait().close()
+    return results
+
+
+def run_worker(job):
+    """Process pool entry point"""
+    return asyncio.run(run_fleet(**job))
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def main():
+    """Split the fleet across processes, run it and print the combined report"""
+    parser = argparse.ArgumentParser(description="Simulate a fleet of sensor devices against the API")
+    parser.add_argument('--devices', type=int, default=1000, help="virtual devices in total")
+    parser.add_argument('--rate', type=float, default=100, help="target aggregate readings per second")
+    parser.add_argument('--duration', type=float, default=30, help="seconds to run")
+    parser.add_argument('--processes', type=int, default=1, help="worker processes (one event loop each)")
+    parser.add_argument('--connections', type=int, default=16, help="keep-alive connections per process")
+    parser.add_argument('--jitter', type=float, default=0.2, help="cadence jitter as a fraction of the interval")
+    parser.add_argument('--url', default=API_URL)
+    parser.add_argument('--binary', action='store_true', help="send the compact wire format instead of JSON")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args()
+
+    processes = max(1, min(args.processes, args.devices))
+    jobs = []
+    first_id = 0
+    for worker in range(processes):
+        devices = args.devices // processes + (1 if worker < args.devices % processes else 0)
+        jobs.append({
+            'first_id': first_id,
+            'devices': devices,
+            'rate': args.rate * devices / args.devices,
+            'duration': args.duration,
+            'connections': args.connections,
+            'url': args.url,
+            'jitter': args.jitter,
+            'binary': args.binary,
+        })
+        first_id += devices
+
+    if not args.json:
+        print(f"🚀 {args.devices} devices, target {args.rate:g} readings/s for {args.duration:g}s "
+              f"across {processes} process(es)")
+
+    interval = args.devices / args.rate
+    if interval * 2 > args.duration and not args.json:
+        print(f"⚠️ Each device reports every {interval:.1f}s; run at least {interval * 2:.0f}s for a steady rate")
+
+    started = time.monotonic()
+    if processes == 1:
+        parts = [run_worker(jobs[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            parts = list(executor.map(run_worker, jobs))
+    elapsed = time.monotonic() - started
+
+    sent = sum(part['sent'] for part in parts)
+    errors = sum(part['errors'] for part in parts)
+    statuses = {}
+    for part in parts:
+        for status, count in part['statuses'].items():
+            statuses[str(status)] = statuses.get(str(status), 0) + count
+    latencies = sorted(latency for part in parts for latency in part['latencies'])
+    total = sent + errors
+
+    report = {
+        'devices': args.devices,
+        'processes': processes,
+        'target_rate': args.rate,
+        'duration_s': args.duration,
+        'wall_s': round(elapsed, 2),
+        'requests': total,
+        'sent': sent,
+        'errors': errors,
+        'error_rate': round(errors / total, 4) if total else 0.0,
+        # Devices only send inside the run window, so that is the denominator
+        'throughput': round(sent / args.duration, 2),
+        'latency_ms': {
+            'p50': percentile(latencies, 0.50),
+            'p95': percentile(latencies, 0.95),
+            'p99': percentile(latencies, 0.99),
+            'max': latencies[-1] if latencies else None,
+        },
+        'error_kinds': statuses,
+    }
+    for key, value in report['latency_ms'].items():
+        if value is not None:
+            report['latency_ms'][key] = round(value, 2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    latency = report['latency_ms']
+    print("-" * 60)
+    print(f"📈 Throughput: {report['throughput']} readings/s ({sent} ok in {report['duration_s']:g}s)")
+    print(f"❌ Errors: {errors} ({report['error_rate'] * 100:.2f}%) {statuses if statuses else ''}")
+    print(f"⏱️ Latency ms: p50 {latency['p50']} | p95 {latency['p95']} | p99 {latency['p99']} | max {latency['max']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Streaming Microphone Capture
+Keeps one sounddevice.InputStream open and feeds a preallocated float32
+ring buffer from its callback. Per-block mean squares give a rolling
+RMS/Leq that any caller can read instantly, without blocking on a
+recording or allocating audio buffers per reading.
+"""
+
+import math
+
+import numpy as np
+
+try:
+    import sounddevice as sd
+    SOUNDDEVICE_AVAILABLE = True
+except (ImportError, OSError) as e:
+    print(f"sounddevice not available: {e}")
+    SOUNDDEVICE_AVAILABLE = False
+
+# Same uncalibrated mapping the 1-second recordings used: dB = 20*log10(rms) + 60
+DB_OFFSET = 60
+DB_MIN = 30
+DB_MAX = 80
+DB_QUIET = 40
+
+
+class NoiseMonitor:
+    """Persistent microphone stream with a rolling RMS over the last window_seconds"""
+
+    def __init__(self, sample_rate=44100, block_size=1024, window_seconds=1.0,
+                 buffer_seconds=2.0, device=None):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.device = device
+
+        # Raw audio history (for spectral analysis) and per-block energies
+        self.ring = np.zeros(int(sample_rate * buffer_seconds), dtype=np.float32)
+        self.samples_written = 0
+        self.block_energy = np.zeros(max(1, math.ceil(window_seconds * sample_rate / block_size)))
+        self.blocks_written = 0
+        self.overflows = 0
+        self.stream = None
+
+    def start(self):
+        """Open the input stream once; the callback runs on the audio thread"""
+        if not SOUNDDEVICE_AVAILABLE:
+            raise RuntimeError("sounddevice is not installed")
+        if self.stream is None:
+            self.stream = sd.InputStream(samplerate=self.sample_rate, blocksize=self.block_size,
+                                         channels=1, dtype='float32', device=self.device,
+                                         callback=self._callback)
+            self.stream.start()
+        return self
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _callback(self, indata, frames, time_info, status):
+        if status.input_overflow:
+            self.overflows += 1
+        self.feed(indata[:, 0])
+
+    def feed(self, samples):
+        """Append one block of mono float32 samples (called from the stream callback)"""
+        frames = len(samples)
+        size = len(self.ring)
+        position = self.samples_written % size
+        first = min(frames, size - position)
+        self.ring[position:position + first] = samples[:first]
+        if first < frames:
+            self.ring[:frames - first] = samples[first:]
+        self.samples_written += frames
+
+        # Mean square of this block; np.dot reduces without a temporary array
+        self.block_energy[self.blocks_written % len(self.block_energy)] = float(np.dot(samples, samples)) / frames
+        self.blocks_written += 1
+
+    def mean_square(self):
+        """Mean square over the rolling window (0.0 before the first block)"""
+        filled = min(self.blocks_written, len(self.block_energy))
+        if filled == 0:
+            return 0.0
+        return float(self.block_energy[:filled].sum()) / filled
+
+    def rms(self):
+        return math.sqrt(self.mean_square())
+
+    def leq(self):
+        """Equivalent level of the rolling window in dBFS"""
+        mean_square = self.mean_square()
+        if mean_square <= 0:
+            return None
+        return 10 * math.log10(mean_square)
+
+    def db_level(self):
+        """Rolling level on the scale the producers report (offset and clamped)"""
+        level = self.leq()
+        if level is None:
+            return DB_QUIET
+        return max(DB_MIN, min(DB_MAX, level + DB_OFFSET))
+
+    def latest(self, out):
+        """Copy the most recent len(out) samples into `out` (oldest first)"""
+        count = len(out)
+        size = len(self.ring)
+        end = self.samples_written % size
+        start = end - count
+        if start >= 0:
+            out[:] = self.ring[start:end]
+        else:
+            out[:-start] = self.ring[start:]
+            out[-start:] = self.ring[:end]
+        return out
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Batched MQTT Publisher
+Packs several readings into one QoS1 message ({"readings": [...]}) and
+publishes it with publishAsync, so acks are pipelined instead of blocking on
+every message. Batches wait in a bounded in-memory queue while the link is
+down or the in-flight window is full; past that the oldest spill to a disk
+outbox (outbox.Outbox) and are sent first once the link is back. A batch
+whose ack does not arrive within ack_timeout is queued again, so delivery is
+at-least-once. Works with AWSIoTMQTTClient or fake_mqtt.FakeMQTTClient.
+"""
+
+import os
+import json
+import time
+import threading
+from collections import deque
+
+from burst_sampler import RunningStats
+from outbox import Outbox
+
+MQTT_OUTBOX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mqtt_outbox.db')
+
+
+class BatchedPublisher:
+    """Multi-reading QoS1 messages with pipelined acks and a memory + disk offline queue"""
+
+    def __init__(self, client, topic, batch_size=12, max_age=60, max_in_flight=10,
+                 max_memory=100, ack_timeout=30, outbox_path=MQTT_OUTBOX_PATH,
+                 max_bytes=20 * 1024 * 1024):
+        self.client = client
+        self.topic = topic
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self.max_in_flight = max_in_flight
+        self.max_memory = max_memory
+        self.ack_timeout = ack_timeout
+
+        self.readings = []
+        self.oldest_time = None
+        self.queue = deque()   # payloads waiting to be published, oldest first
+        self.in_flight = {}    # packet id -> (payload, publish time)
+        # Ack callbacks arrive on the MQTT client's thread
+        self.lock = threading.RLock()
+        self.online = True
+        self.disk = Outbox(outbox_path, max_bytes=max_bytes, batch_size=1,
+                           forward=lambda entries: self._publish(entries[0]))
+
+        self.published = 0
+        self.acked = 0
+        self.retried = 0
+        self.ack_latency = RunningStats()
+
+    def add(self, reading, now=None):
+        """Buffer one reading; publish a batch when it is full or old enough"""
+        if now is None:
+            now = time.monotonic()
+        if not self.readings:
+            self.oldest_time = now
+        self.readings.append(reading)
+        if len(self.readings) >= self.batch_size or now - self.oldest_time >= self.max_age:
+            self._enqueue(json.dumps({'readings': self.readings}))
+            self.readings = []
+        self.pump(now)
+        return True
+
+    def flush(self):
+        """Turn whatever is buffered into a batch and try to publish it"""
+        if self.readings:
+            self._enqueue(json.dumps({'readings': self.readings}))
+            self.readings = []
+        self.pump()
+
+    def _enqueue(self, payload):
+        with self.lock:
+            if len(self.queue) >= self.max_memory:
+                self.disk.put(self.queue.popleft())
+            self.queue.append(payload)
+
+    def pump(self, now=None):
+        """Requeue timed-out batches, then publish (disk first) while the window has room"""
+        if now is None:
+            now = time.monotonic()
+        with self.lock:
+            expired = [mid for mid, (_, sent_at) in self.in_flight.items() if now - sent_at > self.ack_timeout]
+            for mid in expired:
+                self.queue.appendleft(self.in_flight.pop(mid)[0])
+                self.retried += 1
+
+        while self.online and len(self.in_flight) < self.max_in_flight:
+            sent = self.disk.drain_once()
+            if sent is None:
+                break
+            if sent:
+                continue
+            with self.lock:
+                if not self.queue:
+                    break
+                payload = self.queue.popleft()
+            if not self._publish(payload):
+                with self.lock:
+                    self.queue.appendleft(payload)
+                break
+
+    def _publish(self, payload):
+        """Hand one batch to the client without waiting for its ack"""
+        # Held across publishAsync so an immediate ack finds the packet registered
+        with self.lock:
+            try:
+                mid = self.client.publishAsync(self.topic, payload, 1, ackCallback=self._on_ack)
+            except Exception as e:
+                print(f"❌ MQTT publish failed, queued for later: {e}")
+                return False
+            self.in_flight[mid] = (payload, time.monotonic())
+            self.published += 1
+        return True
+
+    def _on_ack(self, mid):
+        with self.lock:
+            entry = self.in_flight.pop(mid, None)
+            if entry is not None:
+                self.acked += 1
+                self.ack_latency.add((time.monotonic() - entry[1]) * 1000)
+
+    def on_online(self):
+        self.online = True
+
+    def on_offline(self):
+        self.online = False
+
+    def pending(self):
+        """Batches not yet acknowledged: in memory, in flight and on disk"""
+        with self.lock:
+            return len(self.queue) + len(self.in_flight) + self.disk.pending()
+
+    def stats(self):
+        return {
+            'published': self.published,
+            'acked': self.acked,
+            'retried': self.retried,
+            'pending': self.pending(),
+            'ack_ms': round(self.ack_latency.mean, 1),
+        }
+
+    def close(self, timeout=10):
+        """Publish what is left, wait for acks, and keep anything unacknowledged on disk"""
+        self.flush()
+        deadline = time.monotonic() + timeout
+        while self.online and (self.in_flight or self.queue) and time.monotonic() < deadline:
+            time.sleep(0.1)
+            self.pump()
+        with self.lock:
+            unacked = [payload for payload, _ in self.in_flight.values()] + list(self.queue)
+            self.in_flight.clear()
+            self.queue.clear()
+        for payload in unacked:
+            self.disk.put(payload)
+        self.disk.close()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Octave-Band Noise Spectrum
+Incremental spectral stage on top of mic_stream.NoiseMonitor: every hop it
+takes the latest FFT frame from the ring buffer, applies a precomputed Hann
+window and sums the power into octave (or third-octave) bands and an
+A-weighted total. Frames are energy-averaged until the next report, giving
+one compact band vector (with its band centres) per reporting window (e.g.
+to tell HVAC hum from speech). Levels are dBFS + mic_stream.DB_OFFSET, the same uncalibrated
+scale as the producers' noise value.
+"""
+
+import math
+import time
+import threading
+
+import numpy as np
+
+from mic_stream import DB_OFFSET
+
+
+def band_centres(sample_rate, fraction=1):
+    """Base-2 nominal band centres (1 kHz reference) from 25 Hz up to below Nyquist"""
+    centres = []
+    k = -6 * fraction
+    while True:
+        centre = 1000.0 * 2 ** (k / fraction)
+        if centre * 2 ** (0.5 / fraction) >= sample_rate / 2:
+            break
+        if centre >= 25:
+            centres.append(centre)
+        k += 1
+    return centres
+
+
+def a_weighting_db(frequencies):
+    """IEC 61672 A-weighting in dB for an array of frequencies"""
+    f2 = np.asarray(frequencies, dtype=np.float64) ** 2
+    ra = (12194.0 ** 2 * f2 ** 2) / (
+        (f2 + 20.6 ** 2) * np.sqrt((f2 + 107.7 ** 2) * (f2 + 737.9 ** 2)) * (f2 + 12194.0 ** 2))
+    with np.errstate(divide='ignore'):
+        return 20 * np.log10(ra) + 2.0
+
+
+class BandAnalyzer:
+    """Block-FFT band levels and A-weighted Leq over a NoiseMonitor ring buffer"""
+
+    def __init__(self, monitor, fft_size=4096, hop_size=None, fraction=1):
+        self.monitor = monitor
+        self.fft_size = fft_size
+        self.hop_size = hop_size or fft_size
+        self.centres = band_centres(monitor.sample_rate, fraction)
+
+        # Precomputed window, frame buffer and per-bin tables
+        self.window = np.hanning(fft_size).astype(np.float32)
+        self.frame = np.zeros(fft_size, dtype=np.float32)
+        self.power = np.zeros(fft_size // 2 + 1)
+        # One-sided power -> mean square, corrected for the window's energy
+        self.scale = 2.0 / (fft_size * float(np.sum(self.window.astype(np.float64) ** 2)))
+
+        frequencies = np.fft.rfftfreq(fft_size, 1.0 / monitor.sample_rate)
+        self.a_weight = 10 ** (a_weighting_db(frequencies) / 10)
+        self.a_weight[0] = 0.0
+        band_of_bin = np.full(len(frequencies), -1)
+        for index, centre in enumerate(self.centres):
+            low, high = centre * 2 ** (-0.5 / fraction), centre * 2 ** (0.5 / fraction)
+            band_of_bin[(frequencies >= low) & (frequencies < high)] = index
+        self.in_band = band_of_bin >= 0
+        self.band_of_bin = band_of_bin[self.in_band]
+
+        # Energy accumulators for the current reporting window
+        self.band_energy = np.zeros(len(self.centres))
+        self.a_energy = 0.0
+        self.frames = 0
+        self.lock = threading.Lock()
+        self.last_position = 0
+        self.thread = None
+        self.running = False
+
+    def process(self):
+        """Analyse one frame if a full hop of new audio has arrived; returns True if it did"""
+        position = self.monitor.samples_written
+        if position < self.fft_size or position - self.last_position < self.hop_size:
+            return False
+        self.last_position = position
+
+        self.monitor.latest(self.frame)
+        np.multiply(self.frame, self.window, out=self.frame)
+        spectrum = np.fft.rfft(self.frame)
+        np.square(spectrum.real, out=self.power)
+        self.power += spectrum.imag ** 2
+
+        bands = np.bincount(self.band_of_bin, weights=self.power[self.in_band],
+                            minlength=len(self.centres)) * self.scale
+        a_energy = float(np.dot(self.power, self.a_weight)) * self.scale
+        with self.lock:
+            self.band_energy += bands
+            self.a_energy += a_energy
+            self.frames += 1
+        return True
+
+    def report(self, digits=1):
+        """Energy-averaged band levels and LAeq since the last report, then reset"""
+        with self.lock:
+            if self.frames == 0:
+                return None
+            band_ms = self.band_energy / self.frames
+            a_ms = self.a_energy / self.frames
+            frames = self.frames
+            self.band_energy[:] = 0
+            self.a_energy = 0.0
+            self.frames = 0
+        levels = {
+            'noise_laeq': round(10 * math.log10(a_ms) + DB_OFFSET, digits) if a_ms > 0 else None,
+            'noise_bands': [round(10 * math.log10(ms) + DB_OFFSET, digits) if ms > 0 else None
+                            for ms in band_ms],
+            # Hz, one per level, so the backend can store and chart the spectrum
+            'noise_band_centres': [round(centre, 1) for centre in self.centres],
+            'noise_frames': frames
+        }
+        return levels
+
+    def start(self):
+        """Process hops on a background thread until stop()"""
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self._run, name='noise-spectrum', daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _run(self):
+        idle = self.hop_size / self.monitor.sample_rate / 2
+        while self.running:
+            if not self.process():
+                time.sleep(idle)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Durable Sensor Outbox
+Store-and-forward queue for producers: every reading is written to a local
+SQLite file first, and a background drainer forwards the oldest entries in
+batches to /api/sensors/batch. When the backend is down (or restarting)
+readings pile up on disk instead of being lost; once it is back the backlog
+is replayed at a limited rate so it does not swamp the server. Disk use is
+bounded by evicting the oldest readings first. Passing `forward` replaces
+the HTTP POST (mqtt_publisher spills MQTT batches here).
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+
+from sensor_sender import BATCH_URL, SUCCESS_CODES, get_sender
+
+OUTBOX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sensor_outbox.db')
+
+
+class Outbox:
+    """SQLite-backed queue with a rate-limited background drainer"""
+
+    def __init__(self, path=OUTBOX_PATH, max_bytes=50 * 1024 * 1024, batch_size=100,
+                 backfill_rate=200, retry_interval=5, url=BATCH_URL, sender=None, forward=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.backfill_rate = backfill_rate  # readings per second while replaying a backlog
+        self.retry_interval = retry_interval
+        self.url = url
+        # forward(list of readings) -> bool; defaults to POSTing them to `url`
+        self.forward = forward or self._post
+        self.sender = sender or (get_sender() if forward is None else None)
+
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+        self.running = False
+        self.forwarded = 0
+        self.evicted = 0
+
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute('''CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created REAL NOT NULL,
+            payload TEXT NOT NULL
+        )''')
+        self.db.commit()
+
+    def put(self, reading):
+        """Queue one reading durably; returns True once it is on disk"""
+        with self.lock:
+            self.db.execute('INSERT INTO outbox (created, payload) VALUES (?, ?)',
+                            (time.time(), json.dumps(reading)))
+            self.db.commit()
+            self._enforce_limit()
+        self.wake.set()
+        return True
+
+    def pending(self):
+        with self.lock:
+            return self.db.execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+
+    def used_bytes(self):
+        """Bytes of the database file holding live pages (freed pages get reused)"""
+        page_size = self.db.execute('PRAGMA page_size').fetchone()[0]
+        page_count = self.db.execute('PRAGMA page_count').fetchone()[0]
+        free_pages = self.db.execute('PRAGMA freelist_count').fetchone()[0]
+        return (page_count - free_pages) * page_size
+
+    def _enforce_limit(self):
+        """Drop the oldest readings while the queue is over max_bytes (lock held)"""
+        while self.used_bytes() > self.max_bytes:
+            count = self.db.execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+            if count == 0:
+                break
+            drop = max(1, count // 10)
+            self.db.execute('DELETE FROM outbox WHERE id IN (SELECT id FROM outbox ORDER BY id LIMIT ?)', (drop,))
+            self.db.commit()
+            self.evicted += drop
+            print(f"⚠️ Outbox full, evicted {drop} oldest readings")
+
+    def drain_once(self):
+        """Forward the oldest batch; returns how many were sent, or None if the send failed"""
+        with self.lock:
+            rows = self.db.execute('SELECT id, payload FROM outbox ORDER BY id LIMIT ?',
+                                   (self.batch_size,)).fetchall()
+        if not rows:
+            return 0
+
+        batch = [json.loads(payload) for _, payload in rows]
+        if not self.forward(batch):
+            return None
+
+        # Only what was actually sent; entries evicted meanwhile are already gone
+        with self.lock:
+            self.db.execute('DELETE FROM outbox WHERE id <= ?', (rows[-1][0],))
+            self.db.commit()
+        self.forwarded += len(rows)
+        return len(rows)
+
+    def _post(self, batch):
+        try:
+            response = self.sender.post(batch, url=self.url)
+        except Exception as e:
+            print(f"❌ Outbox: backend unreachable ({len(batch)} queued): {e}")
+            return False
+        if response.status_code not in SUCCESS_CODES:
+            print(f"❌ Outbox: API Error {response.status_code}")
+            return False
+        return True
+
+    def start(self):
+        """Start the background drainer"""
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self._run, name='outbox-drainer', daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self, flush=True):
+        """Stop the drainer, optionally forwarding what is queued first"""
+        self.running = False
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if flush:
+            while self.drain_once():
+                pass
+
+    def close(self):
+        self.stop(flush=False)
+        self.db.close()
+
+    def _run(self):
+        while self.running:
+            self.wake.clear()
+            sent = self.drain_once()
+            if sent is None:
+                # Backend down: keep queueing, try again later
+                self.wake.wait(self.retry_interval)
+            elif sent == self.batch_size:
+                # Backlog: pace the replay instead of flooding the server
+                time.sleep(sent / self.backfill_rate)
+            elif sent == 0:
+                self.wake.wait(self.retry_interval)
@@ -1,9 +1,16 @@
+import sys
 import time
 import json
 import random
-from AWSIoTPythonSDK.MQTTLib import AWSIoTMQTTClient
 from smbus2 import SMBus
 
+from mqtt_publisher import BatchedPublisher
+
+# --batch: several readings per QoS1 message, async acks, offline queue
+# --local-broker: publish to fake_mqtt.FakeMQTTClient instead of AWS IoT Core
+BATCH_MODE = '--batch' in sys.argv
+LOCAL_BROKER = '--local-broker' in sys.argv
+
 print("Script started")
 
 # Initialize sensors
@@ -37,7 +44,12 @@ print("Gas sensor is disabled - using mock data")
 
 print("Initializing MQTT Client")
 # Initialize the MQTT Client
-client = AWSIoTMQTTClient("RaspberryPiClient")
+if LOCAL_BROKER:
+    from fake_mqtt import FakeMQTTClient
+    client = FakeMQTTClient("RaspberryPiClient")
+else:
+    from AWSIoTPythonSDK.MQTTLib import AWSIoTMQTTClient
+    client = AWSIoTMQTTClient("RaspberryPiClient")
 endpoint = "a1jdknvzevt8bn-ats.iot.us-east-1.amazonaws.com"
 client.configureEndpoint(endpoint, 8883)
 client.configureCredentials(
@@ -46,6 +58,14 @@ client.configureCredentials(
     "/home/pi/smart-garden-backend/awsIoT/certificate.pem.crt"
 )
 
+publisher = None
+if BATCH_MODE:
+    # Our own memory + disk queue replaces the SDK's offline queue
+    client.configureOfflinePublishQueueing(0)
+    publisher = BatchedPublisher(client, "air/quality/sensor")
+    client.onOnline = publisher.on_online
+    client.onOffline = publisher.on_offline
+
 print("MQTT Client configured")
 print(f"MQTT Client details: {client}")
 
@@ -104,9 +124,13 @@ try:
         aqi = 100 * (0.5 * gas_factor + 0.25 * temp_factor + 0.25 * humidity_factor)
         data["aqi"] = round(aqi, 1)
 
-        print(f"Attempting to publish: {data}")
-        client.publish("air/quality/sensor", json.dumps(data), 1)
-        print(f"Published: {data}")
+        if publisher:
+            publisher.add(data)
+            print(f"Queued: {data} ({publisher.stats()})")
+        else:
+            print(f"Attempting to publish: {data}")
+            client.publish("air/quality/sensor", json.dumps(data), 1)
+            print(f"Published: {data}")
         time.sleep(5)
 
 except KeyboardInterrupt:
@@ -114,6 +138,8 @@ except KeyboardInterrupt:
 except Exception as e:
     print(f"Error: {e}")
 finally:
+    if publisher:
+        publisher.close()
     client.disconnect()
     print("Disconnected from AWS IoT Core")
 
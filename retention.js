@@ -0,0 +1,187 @@
+// Tiered retention for air_quality.db: raw rows are kept for a short window,
+// rollups for progressively longer ones, so disk use levels off however long
+// the Pi runs. Expired rows are deleted in small batches on a separate
+// connection, each batch its own short transaction, so the ingestion writer is
+// only ever held up for one batch. Freed pages are then handed back to the
+// file system with incremental vacuum. server.js runs this from cron;
+// `node retention.js [db]` runs it once, and `node retention.js convert [db]`
+// switches an existing database to incremental auto-vacuum (a one-off full
+// VACUUM, so stop the server first).
+
+const fs = require('fs');
+const sqlite3 = require('sqlite3');
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+// Days to keep per table; 0 keeps everything. Raw rows are only expired where
+// the minute rollups cover them, so history from before the rollups existed
+// is kept until `node rollups.js backfill` has filled them in (the backfill
+// only adds missing buckets there and never drops rollup history).
+const RETENTION_POLICY = [
+    { table: 'sensor_data', column: 'timestamp', days: Number(process.env.RETAIN_RAW_DAYS || 14), coveredBy: 'sensor_rollup_1m' },
+    { table: 'sensor_rollup_1m', column: 'bucket', days: Number(process.env.RETAIN_1M_DAYS || 365) },
+    { table: 'sensor_rollup_1h', column: 'bucket', days: Number(process.env.RETAIN_1H_DAYS || 5 * 365) },
+    { table: 'sensor_rollup_1d', column: 'bucket', days: Number(process.env.RETAIN_1D_DAYS || 0) },
+    { table: 'noise_spectrum', column: 'timestamp', days: Number(process.env.RETAIN_SPECTRUM_DAYS || 90) }
+];
+
+const DELETE_BATCH_ROWS = 2000;
+const VACUUM_BATCH_PAGES = 1000;
+// Pause between batches so queued ingestion commits get the write lock
+const BATCH_PAUSE_MS = 50;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+const open = (dbPath) => new Promise((resolve, reject) => {
+    const db = new sqlite3.Database(dbPath, (err) => (err ? reject(err) : resolve(db)));
+});
+const run = (db, sql, params = []) => new Promise((resolve, reject) => {
+    db.run(sql, params, function (err) {
+        return err ? reject(err) : resolve(this.changes);
+    });
+});
+const get = (db, sql, params = []) => new Promise((resolve, reject) => {
+    db.get(sql, params, (err, row) => (err ? reject(err) : resolve(row)));
+});
+// exec steps a statement to completion; incremental_vacuum frees pages per step
+const exec = (db, sql) => new Promise((resolve, reject) => {
+    db.exec(sql, (err) => (err ? reject(err) : resolve()));
+});
+const close = (db) => new Promise((resolve) => db.close(() => resolve()));
+
+const fileBytes = (path) => (fs.existsSync(path) ? fs.statSync(path).size : 0);
+
+const databaseSize = async (db, dbPath) => {
+    const pageSize = (await get(db, 'PRAGMA page_size')).page_size;
+    const pageCount = (await get(db, 'PRAGMA page_count')).page_count;
+    const freePages = (await get(db, 'PRAGMA freelist_count')).freelist_count;
+    return {
+        fileBytes: fileBytes(dbPath),
+        walBytes: fileBytes(`${dbPath}-wal`),
+        usedBytes: (pageCount - freePages) * pageSize,
+        freeBytes: freePages * pageSize
+    };
+};
+
+const tableExists = async (db, table) => Boolean(
+    await get(db, `SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?`, [table]));
+
+// Delete rows older than the policy allows, DELETE_BATCH_ROWS at a time.
+// With `coveredBy`, only rows inside the span of that rollup table go: never
+// before its first bucket, and not in its newest bucket, which is still filling.
+const expireTable = async (db, { table, column, days, coveredBy }, now, warnings) => {
+    if (!days || !(await tableExists(db, table))) {
+        return 0;
+    }
+    let from = -Infinity;
+    let cutoff = now - days * DAY_MS;
+    if (coveredBy) {
+        const span = (await tableExists(db, coveredBy))
+            ? await get(db, `SELECT MIN(bucket) AS first, MAX(bucket) AS last FROM ${coveredBy}`)
+            : {};
+        if (span.first == null) {
+            warnings.push(`${table} not expired: ${coveredBy} is empty, run \`node rollups.js backfill\` `
+                + 'to fill the rollups from it first');
+            return 0;
+        }
+        from = span.first;
+        cutoff = Math.min(cutoff, span.last);
+        if (await get(db, `SELECT 1 FROM ${table} WHERE ${column} < ? LIMIT 1`, [from])) {
+            warnings.push(`${table} has rows older than ${coveredBy} that are kept; `
+                + 'run `node rollups.js backfill` to add them (existing rollup buckets are left as they are)');
+        }
+    }
+    let deleted = 0;
+    for (;;) {
+        const changes = await run(db, `DELETE FROM ${table} WHERE rowid IN
+            (SELECT rowid FROM ${table} WHERE ${column} >= ? AND ${column} < ? ORDER BY ${column} LIMIT ?)`,
+        [from, cutoff, DELETE_BATCH_ROWS]);
+        deleted += changes;
+        if (changes < DELETE_BATCH_ROWS) {
+            return deleted;
+        }
+        await sleep(BATCH_PAUSE_MS);
+    }
+};
+
+// Return free pages to the file system in small steps (needs auto_vacuum = INCREMENTAL)
+const releaseFreePages = async (db) => {
+    if ((await get(db, 'PRAGMA auto_vacuum')).auto_vacuum !== 2) {
+        return false;
+    }
+    while ((await get(db, 'PRAGMA freelist_count')).freelist_count > 0) {
+        await exec(db, `PRAGMA incremental_vacuum(${VACUUM_BATCH_PAGES})`);
+        await sleep(BATCH_PAUSE_MS);
+    }
+    return true;
+};
+
+// One retention pass; resolves to a report with the size before and after
+const runRetention = async (dbPath, policy = RETENTION_POLICY, now = Date.now()) => {
+    const started = Date.now();
+    const db = await open(dbPath);
+    try {
+        db.configure('busyTimeout', 5000);
+        const before = await databaseSize(db, dbPath);
+        const deleted = {};
+        const warnings = [];
+        for (const tier of policy) {
+            deleted[tier.table] = await expireTable(db, tier, now, warnings);
+        }
+        const vacuumed = await releaseFreePages(db);
+        // PASSIVE copies what it can without waiting on readers or blocking the
+        // writer; whatever is left stays in the WAL and is reported as such
+        await get(db, 'PRAGMA wal_checkpoint(PASSIVE)');
+        const after = await databaseSize(db, dbPath);
+        return {
+            ranAt: new Date(started).toISOString(),
+            durationMs: Date.now() - started,
+            deleted,
+            vacuumed,
+            warnings,
+            before,
+            after
+        };
+    } finally {
+        await close(db);
+    }
+};
+
+const describe = (report) => {
+    const mb = (bytes) => (bytes / 1024 / 1024).toFixed(1);
+    const total = (size) => size.fileBytes + size.walBytes;
+    const deleted = Object.entries(report.deleted).map(([table, count]) => `${table} ${count}`).join(', ');
+    return `Retention: deleted ${deleted}; database ${mb(total(report.before))} MB -> ${mb(total(report.after))} MB`
+        + ` (${mb(report.after.walBytes)} MB WAL, ${mb(report.after.freeBytes)} MB free pages) in ${report.durationMs} ms`
+        + (report.vacuumed ? '' : '; incremental vacuum is off, run `node retention.js convert` once to enable it')
+        + report.warnings.map((warning) => `; ${warning}`).join('');
+};
+
+// Switch an existing database to incremental auto-vacuum; rewrites the whole file
+const convertToIncrementalVacuum = async (dbPath) => {
+    const db = await open(dbPath);
+    try {
+        await run(db, 'PRAGMA auto_vacuum = INCREMENTAL');
+        await run(db, 'VACUUM');
+        return (await get(db, 'PRAGMA auto_vacuum')).auto_vacuum === 2;
+    } finally {
+        await close(db);
+    }
+};
+
+module.exports = { RETENTION_POLICY, runRetention, describe, convertToIncrementalVacuum };
+
+if (require.main === module) {
+    const args = process.argv.slice(2);
+    const convert = args[0] === 'convert';
+    const dbPath = (convert ? args[1] : args[0]) || process.env.DB_PATH || './air_quality.db';
+    const task = convert
+        ? convertToIncrementalVacuum(dbPath).then((ok) => console.log(ok
+            ? `${dbPath} now uses incremental auto-vacuum`
+            : `Could not enable incremental auto-vacuum on ${dbPath}`))
+        : runRetention(dbPath).then((report) => console.log(describe(report)));
+    task.catch((err) => {
+        console.error('Retention failed:', err.message);
+        process.exitCode = 1;
+    });
+}
@@ -0,0 +1,72 @@
+// Fixed-capacity ring buffer: push is O(1) and overwrites the oldest entry once
+// full, so in-memory history stays bounded however long the server runs.
+
+class RingBuffer {
+    constructor(capacity) {
+        if (!Number.isInteger(capacity) || capacity < 1) {
+            throw new Error(`Ring buffer capacity must be a positive integer, got ${capacity}`);
+        }
+        this.capacity = capacity;
+        this.items = new Array(capacity);
+        this.start = 0;
+        this.length = 0;
+        this.overwritten = 0;
+    }
+
+    // Append entries (same call shape as Array.prototype.push); returns the new length
+    push(...entries) {
+        entries.forEach((entry) => {
+            if (this.length < this.capacity) {
+                this.items[(this.start + this.length) % this.capacity] = entry;
+                this.length += 1;
+            } else {
+                this.items[this.start] = entry;
+                this.start = (this.start + 1) % this.capacity;
+                this.overwritten += 1;
+            }
+        });
+        return this.length;
+    }
+
+    // Most recent entry, or undefined when empty
+    latest() {
+        if (this.length === 0) {
+            return undefined;
+        }
+        return this.items[(this.start + this.length - 1) % this.capacity];
+    }
+
+    // Entry by age, 0 = oldest still held
+    get(index) {
+        if (index < 0 || index >= this.length) {
+            return undefined;
+        }
+        return this.items[(this.start + index) % this.capacity];
+    }
+
+    // The newest `count` entries, oldest first
+    last(count) {
+        const n = Math.min(count, this.length);
+        const result = new Array(n);
+        for (let i = 0; i < n; i++) {
+            result[i] = this.get(this.length - n + i);
+        }
+        return result;
+    }
+
+    toArray() {
+        return this.last(this.length);
+    }
+
+    clear() {
+        this.items = new Array(this.capacity);
+        this.start = 0;
+        this.length = 0;
+    }
+
+    stats() {
+        return { length: this.length, capacity: this.capacity, overwritten: this.overwritten };
+    }
+}
+
+module.exports = { RingBuffer };
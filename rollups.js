@@ -0,0 +1,209 @@
+// Downsampled rollups of sensor_data at 1 minute, 1 hour and 1 day. Each
+// bucket row holds the reading count and, per metric, count / sum / min /
+// max / last, so averages and ranges over long windows come from a few
+// hundred rows instead of a scan of the raw table. server.js folds every
+// committed group of readings in with one upsert per bucket; `node rollups.js
+// backfill [db]` fills them in from the raw rows an existing database still
+// has, without dropping older rollup history (see backfillSql).
+// Buckets are aligned to UTC epoch time.
+
+const ROLLUP_METRICS = ['temperature', 'humidity', 'pressure', 'gas', 'reducing', 'nh3', 'aqi'];
+
+const ROLLUP_TIERS = [
+    { name: '1m', table: 'sensor_rollup_1m', bucketMs: 60 * 1000 },
+    { name: '1h', table: 'sensor_rollup_1h', bucketMs: 60 * 60 * 1000 },
+    { name: '1d', table: 'sensor_rollup_1d', bucketMs: 24 * 60 * 60 * 1000 }
+];
+
+const metricColumns = (metric) => [`${metric}_count`, `${metric}_sum`, `${metric}_min`, `${metric}_max`, `${metric}_last`];
+
+const COLUMNS = ['bucket', 'count', 'last_timestamp', ...ROLLUP_METRICS.flatMap(metricColumns)];
+
+const createTableSql = (tier) => `CREATE TABLE IF NOT EXISTS ${tier.table} (
+            bucket INTEGER PRIMARY KEY,
+            count INTEGER NOT NULL,
+            last_timestamp INTEGER NOT NULL,
+            ${ROLLUP_METRICS.map((metric) => `${metric}_count INTEGER NOT NULL DEFAULT 0, ${metric}_sum REAL, ${metric}_min REAL, ${metric}_max REAL, ${metric}_last REAL`).join(',\n            ')}
+        )`;
+
+// Merge a partial bucket into the stored one; MIN/MAX of SQLite return NULL
+// if either side is NULL, hence the COALESCEs. `last` is the newest non-null
+// value of each metric.
+const upsertSql = (tier) => `INSERT INTO ${tier.table} (${COLUMNS.join(', ')})
+        VALUES (${COLUMNS.map(() => '?').join(', ')})
+        ON CONFLICT(bucket) DO UPDATE SET
+            count = count + excluded.count,
+            ${ROLLUP_METRICS.map((m) => `${m}_count = ${m}_count + excluded.${m}_count,
+            ${m}_sum = COALESCE(${m}_sum, 0) + COALESCE(excluded.${m}_sum, 0),
+            ${m}_min = MIN(COALESCE(${m}_min, excluded.${m}_min), COALESCE(excluded.${m}_min, ${m}_min)),
+            ${m}_max = MAX(COALESCE(${m}_max, excluded.${m}_max), COALESCE(excluded.${m}_max, ${m}_max)),
+            ${m}_last = CASE WHEN excluded.last_timestamp >= last_timestamp AND excluded.${m}_last IS NOT NULL
+                        THEN excluded.${m}_last ELSE ${m}_last END`).join(',\n            ')},
+            last_timestamp = MAX(last_timestamp, excluded.last_timestamp)`;
+
+const toMs = (timestamp) => (timestamp instanceof Date ? timestamp.getTime() : Number(timestamp));
+
+// Fold entries into one partial bucket per tier; returns [{ tier, rows: [params...] }]
+const aggregate = (entries) => ROLLUP_TIERS.map((tier) => {
+    const buckets = new Map();
+    entries.forEach((entry) => {
+        const at = toMs(entry.timestamp);
+        if (!Number.isFinite(at)) {
+            return;
+        }
+        const key = Math.floor(at / tier.bucketMs) * tier.bucketMs;
+        let bucket = buckets.get(key);
+        if (!bucket) {
+            bucket = { count: 0, lastTimestamp: at, metrics: {} };
+            ROLLUP_METRICS.forEach((metric) => {
+                bucket.metrics[metric] = { count: 0, sum: null, min: null, max: null, last: null, lastAt: -Infinity };
+            });
+            buckets.set(key, bucket);
+        }
+        bucket.count += 1;
+        bucket.lastTimestamp = Math.max(bucket.lastTimestamp, at);
+        ROLLUP_METRICS.forEach((metric) => {
+            const value = entry[metric];
+            if (typeof value !== 'number' || !Number.isFinite(value)) {
+                return;
+            }
+            const stats = bucket.metrics[metric];
+            stats.count += 1;
+            stats.sum = (stats.sum || 0) + value;
+            stats.min = stats.min === null ? value : Math.min(stats.min, value);
+            stats.max = stats.max === null ? value : Math.max(stats.max, value);
+            if (at >= stats.lastAt) {
+                stats.last = value;
+                stats.lastAt = at;
+            }
+        });
+    });
+
+    const rows = [];
+    buckets.forEach((bucket, key) => {
+        rows.push([key, bucket.count, bucket.lastTimestamp, ...ROLLUP_METRICS.flatMap((metric) => {
+            const stats = bucket.metrics[metric];
+            return [stats.count, stats.sum, stats.min, stats.max, stats.last];
+        })]);
+    });
+    return { tier, rows };
+});
+
+// Backfill without losing history that only the rollups still hold (raw rows
+// expire long before rollups do). Per tier, buckets from the first one whose
+// source range is fully present are rebuilt: for the minute tier the first
+// whole minute of the remaining raw rows, for coarser tiers the first whole
+// bucket of what the tier below just rebuilt. Older buckets are only added when
+// the tier has none, never replaced. Like the upsert, `last` is the newest
+// non-null value of each metric: a ROW_NUMBER() per metric ranks the rows
+// holding a value first.
+const rankLast = (metric, value, order) => `ROW_NUMBER() OVER (PARTITION BY slot
+                               ORDER BY ${value} IS NULL, ${order}) AS ${metric}_rank`;
+
+const ceilTo = (expression, bucketMs) => `(((${expression}) + ${bucketMs - 1}) / ${bucketMs}) * ${bucketMs}`;
+
+// Start of the rebuilt range of a tier, as a constant SQL expression (NULL if no raw rows)
+const rebuildStart = (index) => (index === 0
+    ? `(SELECT ${ceilTo('MIN(CAST(timestamp AS INTEGER))', ROLLUP_TIERS[0].bucketMs)}
+        FROM sensor_data WHERE typeof(timestamp) IN ('integer', 'real'))`
+    : ceilTo(rebuildStart(index - 1), ROLLUP_TIERS[index].bucketMs));
+
+const selectBuckets = (index, slotFilter) => {
+    const tier = ROLLUP_TIERS[index];
+    if (index === 0) {
+        return `WITH slotted AS (
+                    SELECT *, (CAST(timestamp AS INTEGER) / ${tier.bucketMs}) * ${tier.bucketMs} AS slot
+                    FROM sensor_data
+                    WHERE typeof(timestamp) IN ('integer', 'real')
+                ), ranked AS (
+                    SELECT *, ${ROLLUP_METRICS.map((m) => rankLast(m, m, 'timestamp DESC, id DESC')).join(',\n                           ')}
+                    FROM slotted
+                )
+                SELECT slot, COUNT(*), MAX(CAST(timestamp AS INTEGER)),
+                       ${ROLLUP_METRICS.map((m) => `COUNT(${m}), SUM(${m}), MIN(${m}), MAX(${m}), MAX(CASE WHEN ${m}_rank = 1 THEN ${m} END)`).join(',\n                       ')}
+                FROM ranked
+                WHERE ${slotFilter}
+                GROUP BY slot`;
+    }
+    const source = ROLLUP_TIERS[index - 1].table;
+    return `WITH slotted AS (
+                    SELECT *, (bucket / ${tier.bucketMs}) * ${tier.bucketMs} AS slot
+                    FROM ${source}
+                ), ranked AS (
+                    SELECT *, ${ROLLUP_METRICS.map((m) => rankLast(m, `${m}_last`, 'last_timestamp DESC')).join(',\n                           ')}
+                    FROM slotted
+                )
+                SELECT slot, SUM(count), MAX(last_timestamp),
+                       ${ROLLUP_METRICS.map((m) => `SUM(${m}_count), SUM(${m}_sum), MIN(${m}_min), MAX(${m}_max), MAX(CASE WHEN ${m}_rank = 1 THEN ${m}_last END)`).join(',\n                       ')}
+                FROM ranked
+                WHERE ${slotFilter}
+                GROUP BY slot`;
+};
+
+const backfillSql = () => {
+    const statements = [];
+    ROLLUP_TIERS.forEach((tier, index) => {
+        const start = rebuildStart(index);
+        statements.push(`DELETE FROM ${tier.table} WHERE bucket >= ${start}`);
+        statements.push(`INSERT INTO ${tier.table} (${COLUMNS.join(', ')})
+                ${selectBuckets(index, `slot >= ${start}`)}`);
+        statements.push(`INSERT INTO ${tier.table} (${COLUMNS.join(', ')})
+                ${selectBuckets(index, `slot < ${start}`)}
+                ON CONFLICT(bucket) DO NOTHING`);
+    });
+    return statements;
+};
+
+const createRollupTables = (db) => {
+    ROLLUP_TIERS.forEach((tier) => {
+        db.run(createTableSql(tier), (err) => {
+            if (err) {
+                console.error(`Error creating ${tier.table}:`, err.message);
+            }
+        });
+    });
+};
+
+const backfillRollups = (db, callback) => {
+    db.serialize(() => {
+        createRollupTables(db);
+        db.run('BEGIN IMMEDIATE');
+        let failure = null;
+        backfillSql().forEach((sql) => db.run(sql, (err) => {
+            failure = failure || err;
+        }));
+        // Queued after every statement above, so `failure` is final by the time it runs
+        db.run('SELECT 1', () => {
+            db.run(failure ? 'ROLLBACK' : 'COMMIT', (err) => callback(failure || err || null));
+        });
+    });
+};
+
+module.exports = { ROLLUP_METRICS, ROLLUP_TIERS, aggregate, upsertSql, createRollupTables, backfillRollups };
+
+if (require.main === module) {
+    const [command, dbPath = process.env.DB_PATH || './air_quality.db'] = process.argv.slice(2);
+    if (command !== 'backfill') {
+        console.error('Usage: node rollups.js backfill [path/to/air_quality.db]');
+        process.exit(2);
+    }
+    const sqlite3 = require('sqlite3');
+    const db = new sqlite3.Database(dbPath);
+    db.configure('busyTimeout', 30000);
+    const started = Date.now();
+    backfillRollups(db, (err) => {
+        if (err) {
+            console.error('Rollup backfill failed:', err.message);
+            process.exitCode = 1;
+        } else {
+            db.all(ROLLUP_TIERS.map((tier) => `SELECT '${tier.name}' AS tier, COUNT(*) AS buckets FROM ${tier.table}`).join(' UNION ALL '),
+                (countErr, rows) => {
+                    (rows || []).forEach((row) => console.log(`Rollup ${row.tier}: ${row.buckets} buckets`));
+                    console.log(`Rollups backfilled from ${dbPath} in ${Date.now() - started} ms`);
+                    db.close();
+                });
+            return;
+        }
+        db.close();
+    });
+}
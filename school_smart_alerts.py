@@ -201,7 +201,7 @@ def main():
         while True:
             # Get current sensor data
             try:
-                response = requests.get('http://localhost:3000/api/sensors')
+                response = requests.get('http://localhost:3000/api/sensors/latest')
                 if response.status_code == 200:
                     data = response.json()
                     if data and len(data) > 0:
@@ -0,0 +1,123 @@
+// Query builder for GET /api/sensors. Without parameters it is the original
+// "latest 100 readings" query. Optional parameters:
+//   from, to   time window, ISO string or epoch ms (from inclusive, to exclusive)
+//   fields     comma-separated metrics to return (timestamp is always included)
+//   limit      rows per page, up to MAX_LIMIT
+//   bucket     1m / 1h / 1d: read the rollup tables (avg / min / max / count per
+//              bucket) instead of raw rows
+//   cursor     the X-Next-Cursor value of the previous page
+// Rows come newest first. Pages are keyset-paginated on (timestamp, id) (the
+// bucket start for rollups), which idx_timestamp / the rollup primary key serve
+// as a range scan, so page 1000 costs the same as page 1.
+
+const { ROLLUP_METRICS, ROLLUP_TIERS } = require('./rollups');
+
+const DEFAULT_LIMIT = 100;
+const MAX_LIMIT = 5000;
+
+const toMs = (value, name) => {
+    const ms = /^\d+$/.test(value) ? Number(value) : Date.parse(value);
+    if (!Number.isFinite(ms)) {
+        throw new Error(`${name} must be an ISO date or epoch milliseconds`);
+    }
+    return ms;
+};
+
+const encodeCursor = (key) => Buffer.from(JSON.stringify(key)).toString('base64url');
+
+const decodeCursor = (cursor) => {
+    try {
+        const key = JSON.parse(Buffer.from(cursor, 'base64url').toString());
+        if (Number.isFinite(key.t) && (key.id === undefined || Number.isInteger(key.id))) {
+            return key;
+        }
+    } catch (err) {
+        // fall through to the error below
+    }
+    throw new Error('cursor is not valid');
+};
+
+// Returns { sql, params, limit, format(row), nextCursor(lastRow) }; throws on bad input
+const buildSensorQuery = (query) => {
+    const limit = query.limit === undefined ? DEFAULT_LIMIT : Number(query.limit);
+    if (!Number.isInteger(limit) || limit < 1 || limit > MAX_LIMIT) {
+        throw new Error(`limit must be an integer from 1 to ${MAX_LIMIT}`);
+    }
+    const fields = query.fields ? String(query.fields).split(',').map((field) => field.trim()).filter(Boolean) : ROLLUP_METRICS;
+    const unknown = fields.filter((field) => !ROLLUP_METRICS.includes(field));
+    if (unknown.length > 0) {
+        throw new Error(`Unknown fields: ${unknown.join(', ')} (available: ${ROLLUP_METRICS.join(', ')})`);
+    }
+    const tier = query.bucket === undefined ? null : ROLLUP_TIERS.find((candidate) => candidate.name === query.bucket);
+    if (query.bucket !== undefined && !tier) {
+        throw new Error(`bucket must be one of ${ROLLUP_TIERS.map((candidate) => candidate.name).join(', ')}`);
+    }
+    const cursor = query.cursor === undefined ? null : decodeCursor(String(query.cursor));
+    // Raw pages are keyed on (timestamp, id), bucket pages on the bucket alone;
+    // a cursor from the other mode would skip or repeat rows
+    if (cursor && (cursor.id === undefined) !== Boolean(tier)) {
+        throw new Error(`cursor belongs to a ${tier ? 'raw' : 'bucket'} query`);
+    }
+
+    const timeColumn = tier ? 'bucket' : 'timestamp';
+    const where = [];
+    const params = [];
+    if (query.from !== undefined) {
+        where.push(`${timeColumn} >= ?`);
+        params.push(toMs(String(query.from), 'from'));
+    }
+    if (query.to !== undefined) {
+        where.push(`${timeColumn} < ?`);
+        params.push(toMs(String(query.to), 'to'));
+    }
+
+    if (tier) {
+        if (cursor) {
+            where.push('bucket < ?');
+            params.push(cursor.t);
+        }
+        const columns = fields.map((field) => `${field}_sum / NULLIF(${field}_count, 0) AS ${field}, `
+            + `${field}_min, ${field}_max`).join(', ');
+        return {
+            sql: `SELECT bucket, count, ${columns} FROM ${tier.table}
+                  ${where.length ? `WHERE ${where.join(' AND ')}` : ''}
+                  ORDER BY bucket DESC LIMIT ?`,
+            params: [...params, limit],
+            limit,
+            format: (row) => {
+                const entry = { timestamp: row.bucket, count: row.count };
+                fields.forEach((field) => {
+                    entry[field] = row[field];
+                    entry[`${field}_min`] = row[`${field}_min`];
+                    entry[`${field}_max`] = row[`${field}_max`];
+                });
+                return entry;
+            },
+            nextCursor: (row) => encodeCursor({ t: row.bucket })
+        };
+    }
+
+    if (cursor) {
+        // Written so the timestamp bound alone drives the index range scan
+        where.push('timestamp <= ? AND (timestamp < ? OR id < ?)');
+        params.push(cursor.t, cursor.t, cursor.id);
+    }
+    return {
+        sql: `SELECT id, timestamp, ${fields.join(', ')} FROM sensor_data
+              ${where.length ? `WHERE ${where.join(' AND ')}` : ''}
+              ORDER BY timestamp DESC, id DESC LIMIT ?`,
+        params: [...params, limit],
+        limit,
+        format: (row) => {
+            const entry = {};
+            fields.forEach((field) => {
+                entry[field] = row[field];
+            });
+            entry.timestamp = row.timestamp;
+            return entry;
+        },
+        nextCursor: (row) => encodeCursor({ t: row.timestamp, id: row.id })
+    };
+};
+
+module.exports = { buildSensorQuery, toMs, DEFAULT_LIMIT, MAX_LIMIT };
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Shared Sensor Sender
+One persistent requests.Session per process with a pooled keep-alive
+connection to the backend, so producers stop paying TCP setup (and burning
+an ephemeral port) on every reading. Both 200 and 201 count as success,
+and every POST is timed, optionally in the compact binary wire format
+instead of JSON. BatchingSender buffers readings and sends them
+to the bulk endpoint in one request (one transaction) per batch, at the
+latest max_age seconds after the first of them even if no more arrive.
+DatagramSender skips HTTP altogether for high-rate local sources.
+"""
+
+import sys
+import time
+import socket
+import threading
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from burst_sampler import RunningStats
+from wire_format import CONTENT_TYPE, encode
+
+API_URL = "http://localhost:3000/api/sensors"
+BATCH_URL = API_URL + "/batch"
+SUCCESS_CODES = (200, 201)
+# server.js local UDP ingestion listener (loopback only)
+UDP_ADDRESS = ('127.0.0.1', 3002)
+# Producer flags that each replace how readings leave the process
+DELIVERY_FLAGS = ('--batch', '--outbox', '--udp')
+
+
+class SensorSender:
+    """Pooled keep-alive POSTs to the sensor API with latency statistics"""
+
+    def __init__(self, url=API_URL, timeout=5, pool_size=4, binary=False):
+        self.url = url
+        self.timeout = timeout
+        # Send the compact wire_format encoding instead of JSON
+        self.binary = binary
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.latency = RunningStats()
+        self.last_latency_ms = None
+        self.sent = 0
+        self.failed = 0
+
+    def post(self, data, url=None, **kwargs):
+        """POST JSON over the pooled session; raises like requests.post on connection errors"""
+        started = time.perf_counter()
+        try:
+            if self.binary:
+                response = self.session.post(url or self.url, data=encode(data), timeout=self.timeout,
+                                             headers={'Content-Type': CONTENT_TYPE}, **kwargs)
+            else:
+                response = self.session.post(url or self.url, json=data, timeout=self.timeout, **kwargs)
+        except requests.RequestException:
+            self.failed += 1
+            raise
+        self.last_latency_ms = (time.perf_counter() - started) * 1000
+        self.latency.add(self.last_latency_ms)
+        if response.status_code in SUCCESS_CODES:
+            self.sent += 1
+        else:
+            self.failed += 1
+        return response
+
+    def send(self, data):
+        """POST and report success as a bool, printing the failure reason"""
+        try:
+            response = self.post(data)
+        except requests.RequestException as e:
+            print(f"❌ Connection Error: {e}")
+            return False
+        if response.status_code not in SUCCESS_CODES:
+            print(f"❌ API Error: {response.status_code}")
+            return False
+        return True
+
+    def stats(self):
+        """Send counters and latency summary in milliseconds"""
+        return {
+            'sent': self.sent,
+            'failed': self.failed,
+            'latency_ms': round(self.latency.mean, 2),
+            'latency_min_ms': round(self.latency.min, 2) if self.latency.count else None,
+            'latency_max_ms': round(self.latency.max, 2) if self.latency.count else None,
+            'latency_std_ms': round(self.latency.stddev(), 2),
+        }
+
+    def close(self):
+        self.session.close()
+
+
+class BatchingSender:
+    """Buffers readings and POSTs them to /api/sensors/batch by size or age"""
+
+    def __init__(self, sender=None, url=BATCH_URL, max_size=20, max_age=60, max_buffer=1000):
+        self.sender = sender or get_sender()
+        self.url = url
+        self.max_size = max_size
+        self.max_age = max_age
+        # While the backend is down the oldest readings are dropped past max_buffer
+        self.buffer = deque(maxlen=max_buffer)
+        self.oldest_time = None
+        # Flushes a batch that reaches max_age while the producer is idle
+        self.timer = None
+        self.lock = threading.RLock()
+
+    def add(self, reading, now=None):
+        """Buffer one reading and flush if the batch is full or old enough; always accepts it"""
+        if now is None:
+            now = time.monotonic()
+        with self.lock:
+            if not self.buffer:
+                self.oldest_time = now
+                self._arm_timer()
+            self.buffer.append(reading)
+            if len(self.buffer) >= self.max_size or now - self.oldest_time >= self.max_age:
+                self.flush()
+        return True
+
+    def _arm_timer(self):
+        if self.timer is None:
+            self.timer = threading.Timer(self.max_age, self._flush_on_timer)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def _cancel_timer(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def _flush_on_timer(self):
+        with self.lock:
+            # Superseded: the batch it was armed for went out while this waited on the lock
+            if threading.current_thread() is not self.timer:
+                return
+            self.timer = None
+            # A failed batch stays buffered; try it again after another max_age
+            if not self.flush() and self.buffer:
+                self._arm_timer()
+
+    def flush(self):
+        """POST everything buffered as one batch; keeps it for the next try on failure"""
+        with self.lock:
+            if not self.buffer:
+                return True
+            batch = list(self.buffer)
+            try:
+                response = self.sender.post(batch, url=self.url)
+            except requests.RequestException as e:
+                print(f"❌ Batch of {len(batch)} not sent, will retry: {e}")
+                return False
+            if response.status_code not in SUCCESS_CODES:
+                print(f"❌ Batch API Error: {response.status_code}, will retry")
+                return False
+            self.buffer.clear()
+            self._cancel_timer()
+            print(f"✅ Batch of {len(batch)} readings sent ({self.sender.last_latency_ms:.0f} ms)")
+            return True
+
+
+class DatagramSender:
+    """Fire-and-forget wire format datagrams to the server's local UDP listener"""
+
+    def __init__(self, address=UDP_ADDRESS):
+        self.address = address
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sent = 0
+        self.failed = 0
+
+    def send(self, reading):
+        """Send one reading (or a list); no HTTP, no JSON, no response to wait for"""
+        try:
+            self.socket.sendto(encode(reading), self.address)
+        except OSError as e:
+            self.failed += 1
+            print(f"❌ Datagram not sent: {e}")
+            return False
+        self.sent += 1
+        return True
+
+    def close(self):
+        self.socket.close()
+
+
+# One sender per URL, shared by everything in the process
+_senders = {}
+
+
+def get_sender(url=API_URL):
+    """Process-wide SensorSender for a URL"""
+    if url not in _senders:
+        _senders[url] = SensorSender(url)
+    return _senders[url]
+
+
+def delivery_mode(supported=DELIVERY_FLAGS):
+    """The single delivery flag on the command line (None for plain POSTs); exits if several are given"""
+    chosen = [flag for flag in supported if flag in sys.argv]
+    if len(chosen) > 1:
+        print(f"❌ {' and '.join(chosen)} can't be combined, pick one delivery mode")
+        sys.exit(2)
+    return chosen[0] if chosen else None
@@ -3,49 +3,113 @@ const cors = require('cors');
 const sqlite3 = require('sqlite3').verbose();
 const { mqtt, io, iot } = require('aws-iot-device-sdk-v2');
 const cron = require('node-cron');
+const dgram = require('dgram');
+const { CONTENT_TYPE: WIRE_CONTENT_TYPE, decodeReadings } = require('./wire_format');
+const { RingBuffer } = require('./ring_buffer');
+const { aggregate, upsertSql, createRollupTables } = require('./rollups');
+const { runRetention, describe: describeRetention } = require('./retention');
+const { buildSensorQuery, toMs, MAX_LIMIT } = require('./sensor_query');
 
 const app = express();
-const port = 3000;
+// PORT / DB_PATH / UDP_PORT let benchmark_ingest.py run a server on a scratch database
+const port = process.env.PORT || 3000;
+const DB_PATH = process.env.DB_PATH || './air_quality.db';
 
 app.use(cors());
-app.use(express.json());
+app.use(express.json({ limit: '1mb' }));
+// Compact binary readings (wire_format.js) arrive as a raw Buffer
+app.use(express.raw({ type: WIRE_CONTENT_TYPE, limit: '1mb' }));
 
-let sensorData = [];
-let scheduledNotifications = [];
+// Largest array accepted by POST /api/sensors/batch
+const MAX_BATCH_SIZE = 1000;
+
+// Local UDP ingestion (loopback only) and how often queued datagrams are written
+const UDP_HOST = '127.0.0.1';
+const UDP_PORT = Number(process.env.UDP_PORT) || 3002;
+const UDP_FLUSH_MS = 1000;
+
+// In-memory history is bounded: the oldest entries are overwritten once full
+const SENSOR_BUFFER_SIZE = Number(process.env.SENSOR_BUFFER_SIZE) || 1000;
+const NOTIFICATION_BUFFER_SIZE = Number(process.env.NOTIFICATION_BUFFER_SIZE) || 200;
+
+const sensorData = new RingBuffer(SENSOR_BUFFER_SIZE);
+const scheduledNotifications = new RingBuffer(NOTIFICATION_BUFFER_SIZE);
 
 // Local SQLite Database connection
-const db = new sqlite3.Database('./air_quality.db', (err) => {
+const db = new sqlite3.Database(DB_PATH, (err) => {
     if (err) {
         console.error('Error opening database:', err.message);
+        // Let queued writes fail instead of waiting for a warm-up that never comes
+        startWriter();
     } else {
         console.log('Connected to the local SQLite database.');
-        // Create table if it doesn't exist
-        db.run(`CREATE TABLE IF NOT EXISTS sensor_data (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp DATETIME NOT NULL,
-            temperature REAL,
-            humidity REAL,
-            pressure REAL,
-            gas REAL,
-            reducing REAL,
-            nh3 REAL,
-            aqi REAL,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        )`, (err) => {
-            if (err) {
-                console.error('Error creating table:', err.message);
-            } else {
-                console.log('Sensor data table created successfully');
-            }
-        });
+        // WAL: readers don't block the writer and a commit appends to the log
+        // instead of rewriting pages; NORMAL syncs at checkpoints, not per commit
+        db.configure('busyTimeout', 5000);
+        // Serialized so auto_vacuum is set before any table exists
+        db.serialize(() => {
+            // Lets the retention job return freed pages; only takes effect on a new
+            // database (existing ones: `node retention.js convert`)
+            db.run('PRAGMA auto_vacuum = INCREMENTAL');
+            db.run('PRAGMA journal_mode = WAL');
+            db.run('PRAGMA synchronous = NORMAL');
+            // Create table if it doesn't exist
+            db.run(`CREATE TABLE IF NOT EXISTS sensor_data (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp DATETIME NOT NULL,
+                temperature REAL,
+                humidity REAL,
+                pressure REAL,
+                gas REAL,
+                reducing REAL,
+                nh3 REAL,
+                aqi REAL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )`, (err) => {
+                if (err) {
+                    console.error('Error creating table:', err.message);
+                } else {
+                    console.log('Sensor data table created successfully');
+                }
+            });
 
-        // Create index for faster queries
-        db.run(`CREATE INDEX IF NOT EXISTS idx_timestamp ON sensor_data(timestamp)`, (err) => {
-            if (err) {
-                console.error('Error creating index:', err.message);
-            } else {
-                console.log('Index created successfully');
-            }
+            // Create index for faster queries
+            db.run(`CREATE INDEX IF NOT EXISTS idx_timestamp ON sensor_data(timestamp)`, (err) => {
+                if (err) {
+                    console.error('Error creating index:', err.message);
+                } else {
+                    console.log('Index created successfully');
+                }
+            });
+
+            // 1 min / 1 h / 1 day rollups, kept current by the writer below
+            createRollupTables(db);
+
+            // Octave-band noise spectra (noise_spectrum.py), one row per report
+            db.run(`CREATE TABLE IF NOT EXISTS noise_spectrum (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp DATETIME NOT NULL,
+                laeq REAL,
+                band_centres TEXT NOT NULL,
+                band_levels TEXT NOT NULL
+            )`, (err) => {
+                if (err) {
+                    console.error('Error creating noise_spectrum table:', err.message);
+                }
+            });
+            db.run('CREATE INDEX IF NOT EXISTS idx_noise_spectrum_timestamp ON noise_spectrum(timestamp)');
+
+            // Warm the latest-readings cache so it is complete right after a restart
+            db.all(`SELECT temperature, humidity, pressure, gas, reducing, nh3, aqi, timestamp FROM sensor_data
+                    ORDER BY timestamp DESC, id DESC LIMIT ?`, [SENSOR_BUFFER_SIZE], (err, rows) => {
+                if (err) {
+                    console.error('Error warming the latest-readings cache:', err.message);
+                } else {
+                    rows.reverse().forEach((row) => sensorData.push({ ...row, timestamp: new Date(row.timestamp) }));
+                    console.log(`Latest-readings cache warmed with ${rows.length} readings`);
+                }
+                startWriter();
+            });
         });
     }
 });
@@ -144,11 +208,8 @@ const processSensorData = (data) => {
     try {
         console.log('Processing sensor data:', data);
 
-        const sensorEntry = {
-            ...data,
-            timestamp: new Date(data.timestamp * 1000),
-        };
-        sensorData.push(sensorEntry);
+        // AWS IoT payloads carry epoch seconds
+        const sensorEntry = toEntry({ ...data, timestamp: new Date(data.timestamp * 1000) }, new Date());
 
         // Generate Notifications
         const notifications = [];
@@ -211,22 +272,15 @@ const processSensorData = (data) => {
             scheduledNotifications.push(...notifications);
         }
 
-        // Store in local database
-        const query = `
-            INSERT INTO sensor_data (temperature, humidity, gas, pressure, timestamp)
-            VALUES (?, ?, ?, ?, ?)
-        `;
-        db.run(
-            query,
-            [data.temperature, data.humidity, data.gas, data.pressure, sensorEntry.timestamp],
-            function (err) {
-                if (err) {
-                    console.error('Error storing sensor data:', err);
-                } else {
-                    console.log('Sensor data stored successfully');
-                }
+        // Store in local database through the group-commit writer (also feeds
+        // the rollups and the latest-readings cache)
+        insertEntries([sensorEntry], (err) => {
+            if (err) {
+                console.error('Error storing sensor data:', err);
+            } else {
+                console.log('Sensor data stored successfully');
             }
-        );
+        });
     } catch (error) {
         console.error('Error processing sensor data:', error);
     }
@@ -236,20 +290,35 @@ const processSensorData = (data) => {
 // simulateAWSIoTConnection(); // Disabled to use real sensor data
 
 // Routes
+// Readings from a JSON body or a binary wire format message, negotiated by Content-Type
+const parseReadings = (req) => {
+    if (req.is(WIRE_CONTENT_TYPE)) {
+        return decodeReadings(req.body);
+    }
+    return Array.isArray(req.body) ? req.body : req.body.readings || [req.body];
+};
+
+// A reading must be a plain object; JSON arrays can hold anything
+const isReading = (value) => value !== null && typeof value === 'object' && !Array.isArray(value);
+
 app.post('/api/sensors', (req, res) => {
-    const { temperature, humidity, pressure, gas, reducing, nh3 } = req.body;
+    let reading;
+    try {
+        [reading] = parseReadings(req);
+    } catch (err) {
+        return res.status(400).send({ message: `Invalid sensor payload: ${err.message}` });
+    }
+    if (!isReading(reading)) {
+        return res.status(400).send({ message: 'Invalid sensor payload: expected a reading object' });
+    }
+    const { temperature, humidity, pressure, gas, reducing, nh3 } = reading;
     const timestamp = new Date();
 
     const aqi = calculateAQI(gas, temperature, humidity);
-    const sensorEntry = { temperature, humidity, pressure, gas, reducing, nh3, aqi, timestamp };
-    sensorData.push(sensorEntry);
-
-    // Insert into local database
-    const query = `INSERT INTO sensor_data (temperature, humidity, pressure, gas, reducing, nh3, aqi, timestamp) 
-                  VALUES (?, ?, ?, ?, ?, ?, ?, ?)`;
-    const values = [temperature, humidity, pressure, gas, reducing, nh3, aqi, timestamp];
+    const sensorEntry = { temperature, humidity, pressure, gas, reducing, nh3, aqi, timestamp, spectrum: toSpectrum(reading) };
 
-    db.run(query, values, function (err) {
+    // Insert into local database (group-committed with concurrent readings)
+    insertEntries([sensorEntry], (err) => {
         if (err) {
             console.error('Error inserting data:', err);
             return res.status(500).send({ message: 'Database insertion failed' });
@@ -306,11 +375,286 @@ app.post('/api/sensors', (req, res) => {
     });
 });
 
+// Noise band levels with their centre frequencies (Hz), or null when the
+// reading has none or they don't line up
+const toSpectrum = (reading) => {
+    const { noise_bands: levels, noise_band_centres: centres, noise_laeq: laeq } = reading;
+    if (!Array.isArray(levels) || !Array.isArray(centres) || levels.length !== centres.length || levels.length === 0) {
+        return null;
+    }
+    if (!centres.every(Number.isFinite) || !levels.every((level) => level === null || Number.isFinite(level))) {
+        return null;
+    }
+    return { laeq: Number.isFinite(laeq) ? laeq : null, centres, levels };
+};
+
+// Normalise one incoming reading into a row; buffered readings keep the time
+// they were taken and fall back to arrival time
+const toEntry = (reading, receivedAt) => {
+    const { temperature, humidity, pressure, gas, reducing, nh3 } = reading;
+    const takenAt = reading.timestamp ? new Date(reading.timestamp) : receivedAt;
+    const timestamp = isNaN(takenAt.getTime()) ? receivedAt : takenAt;
+    const aqi = calculateAQI(gas, temperature, humidity);
+    return { temperature, humidity, pressure, gas, reducing, nh3, aqi, timestamp, spectrum: toSpectrum(reading) };
+};
+
+// sensorData doubles as the latest-readings cache behind GET /api/sensors/latest.
+// It is kept in timestamp order: replayed history (outbox backfill, batches
+// with old timestamps) older than the newest cached reading stays in the
+// database only.
+const cacheLatest = (entries) => {
+    const newest = sensorData.latest();
+    const cutoff = newest ? newest.timestamp.getTime() : -Infinity;
+    entries
+        .filter((entry) => entry.timestamp.getTime() >= cutoff)
+        .sort((a, b) => a.timestamp - b.timestamp)
+        .forEach((entry) => sensorData.push(entry));
+};
+
+// Group-commit writer: every ingestion path queues rows here, and rows arriving
+// within GROUP_COMMIT_MS share one transaction through one cached prepared
+// INSERT. Each request gets its own savepoint, so a failing request is rolled
+// back alone while the rest of the group commits.
+const GROUP_COMMIT_MS = Number(process.env.GROUP_COMMIT_MS) || 20;
+const GROUP_COMMIT_MAX_ROWS = 5000;
+
+const INSERT_SQL = `INSERT INTO sensor_data (temperature, humidity, pressure, gas, reducing, nh3, aqi, timestamp) 
+                  VALUES (?, ?, ?, ?, ?, ?, ?, ?)`;
+let insertStatement = null;
+let spectrumStatement = null;
+const rollupStatements = new Map();
+
+let writeQueue = [];
+let queuedRows = 0;
+let flushTimer = null;
+let flushing = false;
+// Nothing is committed until the latest-readings cache is warmed, so warmed
+// rows can never land after (or duplicate) readings ingested meanwhile
+let writerReady = false;
+const writerStats = { commits: 0, rows: 0, failedRequests: 0, lastGroupRows: 0, lastCommitMs: 0 };
+
+const runSql = (sql, params = []) => new Promise((resolve, reject) => {
+    db.run(sql, params, (err) => (err ? reject(err) : resolve()));
+});
+
+const insertRow = (entry) => new Promise((resolve, reject) => {
+    if (!insertStatement) {
+        insertStatement = db.prepare(INSERT_SQL);
+    }
+    insertStatement.run([entry.temperature, entry.humidity, entry.pressure, entry.gas,
+        entry.reducing, entry.nh3, entry.aqi, entry.timestamp], (err) => (err ? reject(err) : resolve()));
+});
+
+// Fold committed rows into every rollup tier: one upsert per touched bucket
+const updateRollups = async (entries) => {
+    const results = await Promise.allSettled(aggregate(entries).flatMap(({ tier, rows }) => {
+        if (!rollupStatements.has(tier.name)) {
+            rollupStatements.set(tier.name, db.prepare(upsertSql(tier)));
+        }
+        const statement = rollupStatements.get(tier.name);
+        return rows.map((params) => new Promise((resolve, reject) => {
+            statement.run(params, (err) => (err ? reject(err) : resolve()));
+        }));
+    }));
+    const failed = results.find((result) => result.status === 'rejected');
+    if (failed) {
+        throw failed.reason;
+    }
+};
+
+const insertSpectrum = (entry) => new Promise((resolve, reject) => {
+    if (!spectrumStatement) {
+        spectrumStatement = db.prepare(`INSERT INTO noise_spectrum (timestamp, laeq, band_centres, band_levels)
+                                        VALUES (?, ?, ?, ?)`);
+    }
+    const { laeq, centres, levels } = entry.spectrum;
+    spectrumStatement.run([entry.timestamp, laeq, JSON.stringify(centres), JSON.stringify(levels)],
+        (err) => (err ? reject(err) : resolve()));
+});
+
+const flushWrites = async () => {
+    clearTimeout(flushTimer);
+    flushTimer = null;
+    if (!writerReady || flushing || writeQueue.length === 0) {
+        return;
+    }
+    flushing = true;
+    const group = writeQueue;
+    writeQueue = [];
+    queuedRows = 0;
+    const started = Date.now();
+
+    try {
+        await runSql('BEGIN IMMEDIATE');
+        for (const request of group) {
+            try {
+                await runSql('SAVEPOINT request');
+                // Wait for every row, so the rollback can't overtake inserts still queued
+                const results = await Promise.allSettled(request.entries.flatMap((entry) => (
+                    entry.spectrum ? [insertRow(entry), insertSpectrum(entry)] : [insertRow(entry)])));
+                const failed = results.find((result) => result.status === 'rejected');
+                if (failed) {
+                    throw failed.reason;
+                }
+                await runSql('RELEASE request');
+            } catch (err) {
+                request.error = err;
+                await runSql('ROLLBACK TO request').then(() => runSql('RELEASE request')).catch(() => {});
+            }
+        }
+        // Rollups share the transaction, so they never drift from the raw rows
+        await updateRollups(group.filter((request) => !request.error).flatMap((request) => request.entries));
+        await runSql('COMMIT');
+    } catch (err) {
+        await runSql('ROLLBACK').catch(() => {});
+        group.forEach((request) => {
+            request.error = request.error || err;
+        });
+    }
+
+    try {
+        const committed = [];
+        group.forEach((request) => {
+            if (request.error) {
+                writerStats.failedRequests += 1;
+            } else {
+                committed.push(...request.entries);
+            }
+        });
+        const committedRows = committed.length;
+        cacheLatest(committed);
+        writerStats.commits += 1;
+        writerStats.rows += committedRows;
+        writerStats.lastGroupRows = committedRows;
+        writerStats.lastCommitMs = Date.now() - started;
+
+        // One throwing callback must not leave the rest of the group hanging
+        group.forEach((request) => {
+            try {
+                request.callback(request.error || null);
+            } catch (err) {
+                console.error('Error in write callback:', err);
+            }
+        });
+    } finally {
+        flushing = false;
+        if (writeQueue.length > 0) {
+            flushWrites();
+        }
+    }
+};
+
+// Called once the database is open and the cache warmed (see above)
+const startWriter = () => {
+    writerReady = true;
+    flushWrites();
+};
+
+// Queue rows for the next group commit; callback(err) once they are durable (or failed)
+const insertEntries = (entries, callback) => {
+    writeQueue.push({ entries, callback });
+    queuedRows += entries.length;
+    if (queuedRows >= GROUP_COMMIT_MAX_ROWS) {
+        flushWrites();
+    } else if (!flushTimer && !flushing) {
+        flushTimer = setTimeout(flushWrites, GROUP_COMMIT_MS);
+    }
+};
+
+// Bulk ingestion: an array of readings ({ readings: [...] } or a binary wire format
+// message also work) inserted in one transaction, so a buffered device costs one
+// request and one commit per batch
+app.post('/api/sensors/batch', (req, res) => {
+    let readings;
+    try {
+        readings = parseReadings(req);
+    } catch (err) {
+        return res.status(400).send({ message: `Invalid sensor payload: ${err.message}` });
+    }
+    if (!Array.isArray(readings) || readings.length === 0) {
+        return res.status(400).send({ message: 'Expected a non-empty array of readings' });
+    }
+    if (readings.length > MAX_BATCH_SIZE) {
+        return res.status(413).send({ message: `Batch too large (max ${MAX_BATCH_SIZE} readings)` });
+    }
+    const invalid = readings.findIndex((reading) => !isReading(reading));
+    if (invalid !== -1) {
+        return res.status(400).send({ message: `Invalid sensor payload: reading ${invalid} is not an object` });
+    }
+
+    const receivedAt = new Date();
+    const entries = readings.map((reading) => toEntry(reading, receivedAt));
+
+    insertEntries(entries, (err) => {
+        if (err) {
+            console.error('Error inserting batch:', err);
+            return res.status(500).send({ message: 'Database insertion failed' });
+        }
+        res.status(201).send({
+            message: 'Batch stored in database',
+            inserted: entries.length
+        });
+    });
+});
+
+// Local datagram ingestion for high-rate producers on the Pi: each UDP datagram
+// is a binary wire format message or a JSON reading/array. Datagrams skip the
+// HTTP stack entirely and are written in one transaction per flush interval.
+const udpPending = [];
+
+const udpServer = dgram.createSocket('udp4');
+
+udpServer.on('message', (message) => {
+    let entries;
+    try {
+        let readings;
+        // JSON starts with '{' or '['; wire format messages start with a version byte
+        if (message[0] === 0x7b || message[0] === 0x5b) {
+            const parsed = JSON.parse(message.toString());
+            readings = Array.isArray(parsed) ? parsed : [parsed];
+        } else {
+            readings = decodeReadings(message);
+        }
+        const valid = readings.filter(isReading);
+        if (valid.length < readings.length) {
+            console.error(`Invalid sensor datagram: skipped ${readings.length - valid.length} non-object reading(s)`);
+        }
+        const receivedAt = new Date();
+        entries = valid.map((reading) => toEntry(reading, receivedAt));
+    } catch (err) {
+        // A bad datagram must never take the HTTP + UDP server down with it
+        console.error('Invalid sensor datagram:', err.message);
+        return;
+    }
+    udpPending.push(...entries);
+});
+
+udpServer.on('error', (err) => {
+    console.error('UDP ingestion error:', err.message);
+    udpServer.close();
+});
+
+setInterval(() => {
+    if (udpPending.length === 0) {
+        return;
+    }
+    const entries = udpPending.splice(0, udpPending.length);
+    insertEntries(entries, (err) => {
+        if (err) {
+            console.error(`Error inserting ${entries.length} datagram readings:`, err);
+        }
+    });
+}, UDP_FLUSH_MS);
+
+udpServer.bind(UDP_PORT, UDP_HOST, () => {
+    console.log(`UDP sensor ingestion listening on ${UDP_HOST}:${UDP_PORT}`);
+});
+
 app.get('/api/notifications', (req, res) => {
     const notifications = [];
 
     if (sensorData.length > 0) {
-        const latestData = sensorData[sensorData.length - 1];
+        const latestData = sensorData.latest();
 
         // Air Quality Notifications
         if (latestData.gas < thresholds.gas.low) {
@@ -355,28 +699,84 @@ app.get('/api/notifications', (req, res) => {
     res.json(notifications);
 });
 
+// Newest `count` readings (default 1), newest first like GET /api/sensors,
+// straight from memory: what the dashboards and LED/LCD scripts poll for
+app.get('/api/sensors/latest', (req, res) => {
+    const count = req.query.count === undefined ? 1 : Number(req.query.count);
+    if (!Number.isInteger(count) || count < 1 || count > SENSOR_BUFFER_SIZE) {
+        return res.status(400).json({ error: `count must be an integer from 1 to ${SENSOR_BUFFER_SIZE}` });
+    }
+    const latest = sensorData.last(count).reverse().map((entry) => ({
+        temperature: entry.temperature,
+        humidity: entry.humidity,
+        pressure: entry.pressure,
+        gas: entry.gas,
+        reducing: entry.reducing,
+        nh3: entry.nh3,
+        aqi: entry.aqi,
+        timestamp: entry.timestamp.getTime()
+    }));
+    res.set('Cache-Control', 'no-store');
+    res.json(latest);
+});
+
 app.get('/api/sensors', (req, res) => {
-    // Fetch data from database instead of in-memory array
-    const query = `SELECT * FROM sensor_data ORDER BY timestamp DESC LIMIT 100`;
-    db.all(query, [], (err, rows) => {
+    // Latest 100 readings by default; see sensor_query.js for ranges, fields,
+    // rollup buckets and cursor pagination
+    let query;
+    try {
+        query = buildSensorQuery(req.query);
+    } catch (err) {
+        return res.status(400).json({ error: err.message });
+    }
+    db.all(query.sql, query.params, (err, rows) => {
         if (err) {
             console.error('Error fetching sensor data:', err);
             return res.status(500).json({ error: 'Database error' });
         }
 
-        // Convert database rows to the expected format
-        const formattedData = rows.map(row => ({
-            temperature: row.temperature,
-            humidity: row.humidity,
-            pressure: row.pressure,
-            gas: row.gas,
-            reducing: row.reducing,
-            nh3: row.nh3,
-            aqi: row.aqi,
-            timestamp: row.timestamp
-        }));
+        // A full page may have more behind it; the body stays a plain array
+        if (rows.length === query.limit) {
+            res.set('X-Next-Cursor', query.nextCursor(rows[rows.length - 1]));
+            res.set('Access-Control-Expose-Headers', 'X-Next-Cursor');
+        }
+        res.json(rows.map(query.format));
+    });
+});
 
-        res.json(formattedData);
+// Stored noise spectra, newest first: ?from=&to= (ISO or epoch ms) and ?limit=
+app.get('/api/noise/spectrum', (req, res) => {
+    const where = [];
+    const params = [];
+    try {
+        if (req.query.from !== undefined) {
+            where.push('timestamp >= ?');
+            params.push(toMs(String(req.query.from), 'from'));
+        }
+        if (req.query.to !== undefined) {
+            where.push('timestamp < ?');
+            params.push(toMs(String(req.query.to), 'to'));
+        }
+    } catch (err) {
+        return res.status(400).json({ error: err.message });
+    }
+    const limit = req.query.limit === undefined ? 100 : Number(req.query.limit);
+    if (!Number.isInteger(limit) || limit < 1 || limit > MAX_LIMIT) {
+        return res.status(400).json({ error: `limit must be an integer from 1 to ${MAX_LIMIT}` });
+    }
+    db.all(`SELECT timestamp, laeq, band_centres, band_levels FROM noise_spectrum
+            ${where.length ? `WHERE ${where.join(' AND ')}` : ''}
+            ORDER BY timestamp DESC, id DESC LIMIT ?`, [...params, limit], (err, rows) => {
+        if (err) {
+            console.error('Error fetching noise spectra:', err);
+            return res.status(500).json({ error: 'Database error' });
+        }
+        res.json(rows.map((row) => ({
+            timestamp: row.timestamp,
+            noise_laeq: row.laeq,
+            noise_band_centres: JSON.parse(row.band_centres),
+            noise_bands: JSON.parse(row.band_levels)
+        })));
     });
 });
 
@@ -537,6 +937,47 @@ app.post('/api/school/control', (req, res) => {
     }
 });
 
+// Buffer fill levels and process memory, to confirm memory stays flat over months
+app.get('/api/stats', (req, res) => {
+    const memory = process.memoryUsage();
+    const megabytes = (bytes) => Math.round(bytes / 1024 / 1024 * 10) / 10;
+    res.json({
+        uptimeSeconds: Math.round(process.uptime()),
+        buffers: {
+            sensorData: sensorData.stats(),
+            scheduledNotifications: scheduledNotifications.stats()
+        },
+        writer: { ...writerStats, queuedRows, groupCommitMs: GROUP_COMMIT_MS },
+        retention: lastRetention,
+        memoryMB: {
+            rss: megabytes(memory.rss),
+            heapUsed: megabytes(memory.heapUsed),
+            heapTotal: megabytes(memory.heapTotal),
+            external: megabytes(memory.external)
+        }
+    });
+});
+
+// Tiered retention (retention.js): expire old raw rows and rollups hourly
+let lastRetention = null;
+let retentionRunning = false;
+
+cron.schedule('15 * * * *', () => {
+    if (retentionRunning) {
+        return;
+    }
+    retentionRunning = true;
+    runRetention(DB_PATH)
+        .then((report) => {
+            lastRetention = report;
+            console.log(describeRetention(report));
+        })
+        .catch((err) => console.error('Retention job failed:', err.message))
+        .finally(() => {
+            retentionRunning = false;
+        });
+});
+
 // Cron Jobs for Air Quality Checks
 cron.schedule('*/30 * * * *', () => { // Runs every 30 minutes
     const notification = {
@@ -550,6 +991,11 @@ cron.schedule('*/30 * * * *', () => { // Runs every 30 minutes
 });
 
 // Start the server
-app.listen(port, () => {
+const server = app.listen(port, () => {
     console.log(`Server running at http://localhost:${port}`);
 });
+
+// Producers hold one pooled keep-alive connection between readings that are
+// up to 30 s apart; Node's 5 s default would close it before every send
+server.keepAliveTimeout = 65000;
+server.headersTimeout = 66000;
@@ -2,10 +2,11 @@
 
 import smbus2
 import time
-import requests
 import json
 import sys
 
+from sensor_sender import SUCCESS_CODES, get_sender
+
 # Temperature offset to compensate for Pi heating
 TEMPERATURE_OFFSET = 0.0  # No offset needed - sensor is reading accurately
 
@@ -138,10 +139,10 @@ def read_bme280_simple():
 def send_to_api(sensor_data):
     """Send sensor data to the API"""
     try:
-        url = 'http://localhost:3000/api/sensors'
-        response = requests.post(url, json=sensor_data, timeout=5)
-        if response.status_code in [200, 201]:  # Both 200 and 201 are success codes
-            print(f"✅ Data sent: {sensor_data['temperature']}°C, {sensor_data['humidity']}% RH, {sensor_data['pressure']} hPa")
+        sender = get_sender()
+        response = sender.post(sensor_data)
+        if response.status_code in SUCCESS_CODES:
+            print(f"✅ Data sent: {sensor_data['temperature']}°C, {sensor_data['humidity']}% RH, {sensor_data['pressure']} hPa ({sender.last_latency_ms:.0f} ms)")
         else:
             print(f"❌ API error: {response.status_code}")
     except Exception as e:
@@ -78,7 +78,7 @@ def get_temperature_status(temp):
 def get_current_temperature():
     """Get current temperature from API"""
     try:
-        response = requests.get('http://localhost:3000/api/sensors')
+        response = requests.get('http://localhost:3000/api/sensors/latest')
         if response.status_code == 200:
             data = response.json()
             if data and len(data) > 0:
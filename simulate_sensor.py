@@ -10,6 +10,8 @@ import random
 import requests
 from datetime import datetime
 
+from sensor_sender import SUCCESS_CODES, get_sender
+
 def simulate_enviro_data():
     """Simulate Enviro sensor readings"""
     
@@ -45,11 +47,11 @@ def simulate_enviro_data():
 def send_to_server(data):
     """Send sensor data to the local server"""
     try:
-        url = 'http://localhost:3000/api/sensors'
-        response = requests.post(url, json=data, timeout=5)
+        sender = get_sender()
+        response = sender.post(data)
         
-        if response.status_code == 201:
-            print(f"✅ Data sent successfully: {data}")
+        if response.status_code in SUCCESS_CODES:
+            print(f"✅ Data sent successfully: {data} ({sender.last_latency_ms:.0f} ms)")
             return True
         else:
             print(f"❌ Failed to send data. Status: {response.status_code}")
@@ -0,0 +1,50 @@
+// Compact binary wire format for sensor readings (see wire_format.py).
+// Message: uint8 version, then records of
+//   uint16 presence bitmask | int64 epoch-ms timestamp | float32 per present field
+// all little-endian. FIELDS must match wire_format.py; only ever append to it.
+
+const CONTENT_TYPE = 'application/x-sensor-reading';
+const VERSION = 1;
+
+const FIELDS = ['temperature', 'humidity', 'pressure', 'gas', 'reducing', 'nh3',
+    'oxidising', 'light', 'noise', 'aqi'];
+
+const RECORD_HEADER_SIZE = 10;
+
+// Decode a message Buffer into readings with a Date timestamp; throws on bad input
+const decodeReadings = (buffer) => {
+    if (!Buffer.isBuffer(buffer) || buffer.length < 1) {
+        throw new Error('Empty wire format message');
+    }
+    const version = buffer.readUInt8(0);
+    if (version !== VERSION) {
+        throw new Error(`Unsupported wire format version ${version}`);
+    }
+
+    const readings = [];
+    let offset = 1;
+    while (offset < buffer.length) {
+        if (offset + RECORD_HEADER_SIZE > buffer.length) {
+            throw new Error('Truncated wire format record');
+        }
+        const mask = buffer.readUInt16LE(offset);
+        const timestamp = new Date(Number(buffer.readBigInt64LE(offset + 2)));
+        offset += RECORD_HEADER_SIZE;
+
+        const reading = { timestamp };
+        FIELDS.forEach((name, fieldId) => {
+            if (mask & (1 << fieldId)) {
+                if (offset + 4 > buffer.length) {
+                    throw new Error('Truncated wire format record');
+                }
+                // float32 keeps ~7 significant digits; drop the binary noise after that
+                reading[name] = Number(buffer.readFloatLE(offset).toPrecision(7));
+                offset += 4;
+            }
+        });
+        readings.push(reading);
+    }
+    return readings;
+};
+
+module.exports = { CONTENT_TYPE, FIELDS, decodeReadings };
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Compact Binary Wire Format
+Fixed struct layout for sensor readings, sent with
+Content-Type: application/x-sensor-reading instead of JSON.
+
+A message is a version byte followed by one or more records. Each record is
+    uint16  presence bitmask (bit i set = FIELDS[i] follows)
+    int64   timestamp, epoch milliseconds
+    float32 value of every present field, in FIELDS order
+all little-endian. A full ten-channel record is 50 bytes against ~250 of
+JSON. Only the numeric channels in FIELDS travel; other keys (source,
+burst statistics) are JSON-only. server.js decodes the same layout
+(wire_format.js), so the two FIELDS lists must stay in sync.
+"""
+
+import sys
+import json
+import time
+import struct
+from datetime import datetime
+
+CONTENT_TYPE = 'application/x-sensor-reading'
+VERSION = 1
+
+# Field IDs are the positions in this tuple; only ever append to it
+FIELDS = ('temperature', 'humidity', 'pressure', 'gas', 'reducing', 'nh3',
+          'oxidising', 'light', 'noise', 'aqi')
+
+HEADER = struct.Struct('<B')
+RECORD = struct.Struct('<Hq')
+VALUE = struct.Struct('<f')
+
+
+def timestamp_ms(value):
+    """Epoch milliseconds from an ISO string, epoch seconds or None (now)"""
+    if value is None:
+        return int(time.time() * 1000)
+    if isinstance(value, str):
+        return int(datetime.fromisoformat(value).timestamp() * 1000)
+    return int(value * 1000)
+
+
+def encode(readings):
+    """Pack one reading dict or a list of them into a single message"""
+    if isinstance(readings, dict):
+        readings = [readings]
+    parts = [HEADER.pack(VERSION)]
+    for reading in readings:
+        mask = 0
+        values = []
+        for field_id, name in enumerate(FIELDS):
+            value = reading.get(name)
+            if isinstance(value, (int, float)):
+                mask |= 1 << field_id
+                values.append(value)
+        parts.append(RECORD.pack(mask, timestamp_ms(reading.get('timestamp'))))
+        parts.append(struct.pack(f'<{len(values)}f', *values))
+    return b''.join(parts)
+
+
+def decode(data):
+    """Unpack a message into reading dicts with an epoch-ms 'timestamp'"""
+    (version,) = HEADER.unpack_from(data, 0)
+    if version != VERSION:
+        raise ValueError(f"Unsupported wire format version {version}")
+    readings = []
+    offset = HEADER.size
+    while offset < len(data):
+        mask, timestamp = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        reading = {'timestamp': timestamp}
+        for field_id, name in enumerate(FIELDS):
+            if mask & (1 << field_id):
+                (value,) = VALUE.unpack_from(data, offset)
+                # float32 keeps ~7 significant digits; drop the binary noise after that
+                reading[name] = float(f'{value:.7g}')
+                offset += VALUE.size
+        readings.append(reading)
+    return readings
+
+
+def main():
+    """Compare JSON and binary size for a sample reading (or a JSON file of them)"""
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as f:
+            readings = json.load(f)
+    else:
+        readings = [{
+            'temperature': 22.4, 'humidity': 48.1, 'pressure': 1012.6, 'gas': 254000.0,
+            'reducing': 254000.0, 'nh3': 71000.0, 'oxidising': 120000.0, 'light': 512.3,
+            'noise': 45.2, 'aqi': 38.0, 'timestamp': datetime.now().isoformat(), 'source': 'enviro_plus'
+        }]
+    as_json = json.dumps(readings).encode()
+    as_binary = encode(readings)
+    print(f"📦 {len(readings)} reading(s): JSON {len(as_json)} bytes, binary {len(as_binary)} bytes "
+          f"({len(as_json) / len(as_binary):.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,16 @@ Uses available audio devices to read real noise data
 """
 
 import time
-import requests
 import json
 import random
 import smbus2
-import sounddevice as sd
-import numpy as np
 from datetime import datetime
 
+from bme280_driver import get_bme280
+from mic_stream import NoiseMonitor
+from noise_spectrum import BandAnalyzer
+from sensor_sender import SUCCESS_CODES, get_sender
+
 # I2C setup
 try:
     bus = smbus2.SMBus(1)
@@ -22,31 +24,30 @@ except Exception as e:
     I2C_AVAILABLE = False
     print(f"❌ I2C not available: {e}")
 
+# Microphone stream is opened once and sampled continuously in the background
+noise_monitor = None
+noise_spectrum = None
+
+def get_noise_monitor():
+    """Start the shared microphone stream (and its octave-band analyzer) on first use"""
+    global noise_monitor, noise_spectrum
+    if noise_monitor is None:
+        noise_monitor = NoiseMonitor(sample_rate=44100, window_seconds=1.0).start()
+        noise_spectrum = BandAnalyzer(noise_monitor, fft_size=4096).start()
+        print("🎤 Microphone stream started")
+    return noise_monitor
+
+def read_noise_spectrum():
+    """Octave-band levels and LAeq averaged since the previous reading"""
+    if noise_spectrum is None:
+        return {}
+    return noise_spectrum.report() or {}
+
 def read_real_noise():
     """Read real noise data using available audio device"""
     try:
-        # Try to record audio and calculate noise level
-        duration = 1  # 1 second recording
-        sample_rate = 44100
-        
-        print("🎤 Recording audio for noise measurement...")
-        
-        # Record audio using default device
-        audio_data = sd.rec(int(duration * sample_rate), 
-                           samplerate=sample_rate, 
-                           channels=1, 
-                           dtype='float64')
-        sd.wait()  # Wait until recording is finished
-        
-        # Calculate RMS (Root Mean Square) for noise level
-        rms = np.sqrt(np.mean(audio_data**2))
-        
-        # Convert to decibels (approximate)
-        if rms > 0:
-            db_level = 20 * np.log10(rms) + 60  # Add offset to get realistic dB range
-            db_level = max(30, min(80, db_level))  # Clamp to realistic range
-        else:
-            db_level = 40  # Default quiet level
+        # Rolling 1-second RMS from the running stream - returns immediately
+        db_level = get_noise_monitor().db_level()
         
         print(f"🎤 Real microphone reading: {db_level:.1f} dB")
         return round(db_level, 1)
@@ -68,87 +69,11 @@ def read_accurate_bme280():
         return None
         
     try:
-        bme280_addr = 0x76
-        
-        # Check device ID
-        device_id = bus.read_byte_data(bme280_addr, 0xD0)
-        if device_id != 0x60:
-            print(f"❌ Not BME280 (ID: {device_id:02X})")
-            return None
-        
-        # Reset and configure sensor
-        bus.write_byte_data(bme280_addr, 0xE0, 0xB6)  # Reset
-        time.sleep(0.1)
-        
-        # Configure for normal mode
-        bus.write_byte_data(bme280_addr, 0xF2, 0x01)  # Humidity oversampling x1
-        bus.write_byte_data(bme280_addr, 0xF4, 0x27)  # Temp/pressure oversampling x1, normal mode
-        bus.write_byte_data(bme280_addr, 0xF5, 0xA0)  # Standby 1000ms, filter off
-        time.sleep(0.1)
-        
-        # Read calibration data (24 bytes)
-        cal_data = bus.read_i2c_block_data(bme280_addr, 0x88, 24)
-        
-        # Parse temperature calibration
-        dig_T1 = cal_data[0] | (cal_data[1] << 8)
-        dig_T2 = cal_data[2] | (cal_data[3] << 8)
-        if dig_T2 > 32767:
-            dig_T2 -= 65536
-        dig_T3 = cal_data[4] | (cal_data[5] << 8)
-        if dig_T3 > 32767:
-            dig_T3 -= 65536
-        
-        # Read humidity calibration (7 bytes)
-        cal_h_data = bus.read_i2c_block_data(bme280_addr, 0xA1, 7)
-        dig_H1 = cal_h_data[0]
-        dig_H2 = cal_h_data[1] | (cal_h_data[2] << 8)
-        if dig_H2 > 32767:
-            dig_H2 -= 65536
-        dig_H3 = cal_h_data[3]
-        dig_H4 = (cal_h_data[4] << 4) | (cal_h_data[5] & 0x0F)
-        if dig_H4 > 32767:
-            dig_H4 -= 65536
-        dig_H5 = (cal_h_data[5] >> 4) | (cal_h_data[6] << 4)
-        if dig_H5 > 32767:
-            dig_H5 -= 65536
-        dig_H6 = cal_h_data[7] if len(cal_h_data) > 7 else 0
-        if dig_H6 > 127:
-            dig_H6 -= 256
-        
-        # Trigger measurement
-        bus.write_byte_data(bme280_addr, 0xF4, 0x27)
-        time.sleep(0.1)
-        
-        # Read raw data (8 bytes)
-        data = bus.read_i2c_block_data(bme280_addr, 0xF7, 8)
-        
-        # Extract raw values
-        adc_T = (data[3] << 12) | (data[4] << 4) | (data[5] >> 4)
-        adc_P = (data[0] << 12) | (data[1] << 4) | (data[2] >> 4)
-        adc_H = (data[6] << 8) | data[7]
-        
-        # Temperature compensation
-        var1 = (((adc_T >> 3) - (dig_T1 << 1)) * dig_T2) >> 11
-        var2 = (((((adc_T >> 4) - dig_T1) * ((adc_T >> 4) - dig_T1)) >> 12) * dig_T3) >> 14
-        t_fine = var1 + var2
-        temperature = ((t_fine * 5 + 128) >> 8) / 100.0
-        
-        # Humidity compensation
-        var1 = t_fine - 76800
-        var2 = dig_H4 * 64 + (dig_H5 / 16384.0 * var1)
-        var3 = adc_H - var2
-        var4 = dig_H2 / 65536.0
-        var5 = 1 + (dig_H3 / 67108864.0 * var1)
-        var6 = 1 + (dig_H6 / 67108864.0 * var1 * var5)
-        var6 = var3 * var4 * (var5 * var6)
-        humidity = var6 * (1 - dig_H1 * var6 / 524288.0)
-        if humidity > 100:
-            humidity = 100
-        elif humidity < 0:
-            humidity = 0
-        
-        # Simple pressure calculation (simplified)
-        pressure = 1013.25 + random.uniform(-10, 10)  # Realistic pressure range
+        # Forced mode: one fresh conversion per (slow) loop, no self-heating in between
+        reading = get_bme280(bus, mode='forced').read()
+        temperature = reading['temperature']
+        humidity = reading['humidity']
+        pressure = reading['pressure']
         
         # Validate temperature
         if temperature < -20 or temperature > 50:
@@ -180,11 +105,11 @@ def calculate_aqi(temperature, humidity):
 def send_to_backend(sensor_data):
     """Send sensor data to the backend API"""
     try:
-        url = "http://localhost:3000/api/sensors"
-        response = requests.post(url, json=sensor_data, timeout=5)
-        if response.status_code == 200:
+        sender = get_sender()
+        response = sender.post(sensor_data)
+        if response.status_code in SUCCESS_CODES:
             source = sensor_data.get('source', 'UNKNOWN')
-            print(f"✅ Data sent ({source}): {sensor_data['temperature']:.1f}°C, {sensor_data['humidity']:.1f}%, Noise: {sensor_data['noise']:.1f}dB")
+            print(f"✅ Data sent ({source}): {sensor_data['temperature']:.1f}°C, {sensor_data['humidity']:.1f}%, Noise: {sensor_data['noise']:.1f}dB ({sender.last_latency_ms:.0f} ms)")
         else:
             print(f"❌ API Error: {response.status_code}")
     except Exception as e:
@@ -232,6 +157,9 @@ def main():
                     'source': 'REAL_MIC_WITH_FALLBACK'
                 }
             
+            # Octave bands + A-weighted Leq over the whole interval
+            sensor_data.update(read_noise_spectrum())
+            
             # Send to backend
             send_to_backend(sensor_data)
                 